@@ -0,0 +1,276 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import os
+import shlex
+import subprocess
+import time
+
+# local imports
+from csmock.common.util import strlist_to_shell_cmd
+
+# available buildroot backends
+BACKENDS = ["mock", "bwrap"]
+
+# default directory with pre-extracted base trees (one subdirectory per mock profile)
+BWRAP_BASE_DIR = "/var/tmp/csmock/bwrap-base"
+
+# default directory with upper dirs of the bwrap buildroots
+BWRAP_WORK_DIR = "/var/tmp/csmock/bwrap"
+
+# user and group used for unprivileged commands in the bwrap buildroot (unless found in the base tree)
+BWRAP_UNPRIV_USER = "mockbuild"
+BWRAP_UNPRIV_ID = 1000
+
+# directories created in the bwrap buildroot by init
+BWRAP_BUILDDIRS = ["BUILD", "BUILDROOT", "RPMS", "SOURCES", "SPECS", "SRPMS"]
+
+
+class BackendError(Exception):
+    pass
+
+
+class BuildrootBackend:
+    """buildroot where a scan executes its commands
+
+    A backend does not execute anything on its own.  It only returns commands for
+    the operations on the buildroot, so that they can be logged, piped, and
+    interrupted in the same way regardless of the backend.  translate() maps the
+    arguments of mock used by csmock and its plug-ins to these operations."""
+    name = None
+
+    def init_cmd(self):
+        """create the buildroot from scratch"""
+        raise NotImplementedError
+
+    def install_cmd(self, pkgs):
+        """make the given packages available in the buildroot"""
+        raise NotImplementedError
+
+    def shell_cmd(self, cmd, unpriv=False):
+        """run cmd by /bin/sh in the buildroot (an interactive shell if cmd is None)"""
+        raise NotImplementedError
+
+    def copy_in_cmd(self, srcs, dst):
+        """copy srcs from the host to dst in the buildroot"""
+        raise NotImplementedError
+
+    def copy_out_cmd(self, srcs, dst):
+        """copy srcs from the buildroot to dst on the host"""
+        raise NotImplementedError
+
+    def clean_cmd(self):
+        """remove the buildroot"""
+        raise NotImplementedError
+
+    def root_path(self):
+        """return the directory on the host where writes to the buildroot land"""
+        raise NotImplementedError
+
+    def translate(self, args):
+        """return the command doing what `mock args` would do"""
+        args = [arg for arg in args if arg not in ["--quiet", "--disable-plugin=selinux"]]
+
+        # repositories can only be added by mock
+        while "--addrepo" in args:
+            idx = args.index("--addrepo")
+            del args[idx:idx + 2]
+
+        opt = args[0] if args else None
+        if args == ["--init"]:
+            return self.init_cmd()
+        if args == ["--clean"] or (opt is not None and opt.startswith("--scrub") and len(args) == 1):
+            return self.clean_cmd()
+        if args == ["--shell"]:
+            return self.shell_cmd(None)
+        if opt in ["--shell", "--chroot"] and len(args) == 2:
+            return self.shell_cmd(args[1])
+        if args[:2] == ["--unpriv", "--chroot"] and len(args) == 3:
+            return self.shell_cmd(args[2], unpriv=True)
+        if opt == "--install" and len(args) > 1:
+            return self.install_cmd(args[1:])
+        if opt == "--copyin" and len(args) > 2:
+            return self.copy_in_cmd(args[1:-1], args[-1])
+        if opt == "--copyout" and len(args) > 2:
+            return self.copy_out_cmd(args[1:-1], args[-1])
+        if args == ["--print-root-path"]:
+            return ["echo", self.root_path()]
+
+        raise BackendError(f"not supported by the {self.name} backend: mock {strlist_to_shell_cmd(args)}")
+
+
+class MockBackend(BuildrootBackend):
+    """buildroot managed by mock (supports everything mock does)"""
+    name = "mock"
+
+    def __init__(self, def_cmd):
+        # default arguments of mock (shared with MockWrapper, which keeps extending them)
+        self.def_cmd = def_cmd
+
+    def mock_cmd(self, args):
+        return self.def_cmd + args
+
+    def init_cmd(self):
+        return self.mock_cmd(["--init"])
+
+    def install_cmd(self, pkgs):
+        return self.mock_cmd(["--install"] + pkgs)
+
+    def shell_cmd(self, cmd, unpriv=False):
+        if cmd is None:
+            return self.mock_cmd(["--shell"])
+        if unpriv:
+            return self.mock_cmd(["--unpriv", "--chroot", cmd])
+        return self.mock_cmd(["--shell", cmd])
+
+    def copy_in_cmd(self, srcs, dst):
+        return self.mock_cmd(["--copyin"] + srcs + [dst])
+
+    def copy_out_cmd(self, srcs, dst):
+        return self.mock_cmd(["--copyout"] + srcs + [dst])
+
+    def clean_cmd(self):
+        return self.mock_cmd(["--clean"])
+
+    def root_path(self):
+        return None
+
+    def translate(self, args):
+        return self.mock_cmd(args)
+
+
+def passwd_ids(base_dir, user):
+    """return (uid, gid) of user in the passwd file of the given tree (or None if not found)"""
+    try:
+        with open(os.path.join(base_dir, "etc/passwd")) as f:
+            for line in f:
+                fields = line.split(":")
+                if len(fields) > 3 and fields[0] == user:
+                    return (int(fields[2]), int(fields[3]))
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class BwrapBackend(BuildrootBackend):
+    """lightweight buildroot run by bubblewrap
+
+    The buildroot is an overlay of a pre-extracted read-only base tree (e.g. the
+    root cache of a mock profile extracted to a directory) and of an upper dir
+    owned by the scan.  Creating the buildroot only means creating an empty upper
+    dir.  No packages can be installed.  Requested packages need to be present in
+    the base tree already."""
+    name = "bwrap"
+
+    def __init__(self, base_dir, work_dir):
+        self.base_dir = base_dir
+        self.upper_dir = os.path.join(work_dir, "upper")
+        self.overlay_work_dir = os.path.join(work_dir, "work")
+
+        ids = passwd_ids(base_dir, BWRAP_UNPRIV_USER)
+        self.unpriv_ids = ids or (BWRAP_UNPRIV_ID, BWRAP_UNPRIV_ID)
+
+    def bwrap_cmd(self, unpriv=False):
+        (uid, gid) = self.unpriv_ids if unpriv else (0, 0)
+        return ["bwrap",
+                "--overlay-src", self.base_dir,
+                "--overlay", self.upper_dir, self.overlay_work_dir, "/",
+                "--dev", "/dev",
+                "--proc", "/proc",
+                "--unshare-all",
+                "--die-with-parent",
+                "--hostname", "csmock",
+                "--uid", str(uid),
+                "--gid", str(gid),
+                "--setenv", "HOME", "/builddir" if unpriv else "/root",
+                "--chdir", "/"]
+
+    def init_cmd(self):
+        upper = shlex.quote(self.upper_dir)
+        work = shlex.quote(self.overlay_work_dir)
+        dirs = " ".join(f"/builddir/build/{name}" for name in BWRAP_BUILDDIRS)
+        (uid, gid) = self.unpriv_ids
+        init = strlist_to_shell_cmd(self.shell_cmd(f"mkdir -p {dirs} && chown -R {uid}:{gid} /builddir"))
+        return ["sh", "-c", f"{self.remove_dirs_cmd()} && mkdir -p {upper} {work} && {init}"]
+
+    def install_cmd(self, pkgs):
+        # check that the packages are available in the base tree
+        return self.shell_cmd("rpm -q --whatprovides %s >/dev/null" % strlist_to_shell_cmd(pkgs))
+
+    def shell_cmd(self, cmd, unpriv=False):
+        if cmd is None:
+            return self.bwrap_cmd(unpriv) + ["/bin/sh"]
+        return self.bwrap_cmd(unpriv) + ["/bin/sh", "-c", cmd]
+
+    def copy_in_cmd(self, srcs, dst):
+        if len(srcs) == 1:
+            # copy the only source to the given path
+            (src_dir, name) = os.path.split(os.path.normpath(srcs[0]))
+            extract = "tmp=$(mktemp -d) && tar -xC \"$tmp\" && rm -rf %s && mv \"$tmp\"/%s %s && rmdir \"$tmp\"" \
+                % (shlex.quote(dst), shlex.quote(name), shlex.quote(dst))
+            pack = ["tar", "-cC", src_dir or "/", name]
+        else:
+            # copy the sources into the given directory
+            extract = "mkdir -p %s && tar -xC %s" % (shlex.quote(dst), shlex.quote(dst))
+            pack = ["tar", "-cP"] + srcs
+        cmd = strlist_to_shell_cmd(pack) + " | " + strlist_to_shell_cmd(self.shell_cmd(extract))
+        return ["sh", "-c", cmd]
+
+    def copy_out_cmd(self, srcs, dst):
+        if len(srcs) == 1:
+            (src_dir, name) = os.path.split(os.path.normpath(srcs[0]))
+            pack = "tar -cC %s %s" % (shlex.quote(src_dir or "/"), shlex.quote(name))
+            extract = "tmp=$(mktemp -d) && tar -xC \"$tmp\" && rm -rf %s && mv \"$tmp\"/%s %s && rmdir \"$tmp\"" \
+                % (shlex.quote(dst), shlex.quote(name), shlex.quote(dst))
+        else:
+            pack = "tar -cP " + strlist_to_shell_cmd(srcs)
+            extract = "mkdir -p %s && tar -xC %s" % (shlex.quote(dst), shlex.quote(dst))
+        cmd = strlist_to_shell_cmd(self.shell_cmd(pack)) + " | (" + extract + ")"
+        return ["sh", "-c", cmd]
+
+    def remove_dirs_cmd(self):
+        # the work dir of overlayfs contains directories without any permissions
+        dirs = "%s %s" % (shlex.quote(self.upper_dir), shlex.quote(self.overlay_work_dir))
+        return f"{{ chmod -Rf u+rwx {dirs}; rm -rf {dirs}; }} 2>/dev/null; ! test -e {shlex.quote(self.upper_dir)}"
+
+    def clean_cmd(self):
+        return ["sh", "-c", self.remove_dirs_cmd()]
+
+    def root_path(self):
+        return self.upper_dir
+
+
+def benchmark(backend, num_cmds):
+    """return (start-up time, average latency of a trivial command) of backend in seconds"""
+    def run(cmd):
+        if subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+            raise BackendError(f"command failed: {strlist_to_shell_cmd(cmd)}")
+
+    try:
+        start_time = time.monotonic()
+        run(backend.init_cmd())
+        init_time = time.monotonic() - start_time
+
+        start_time = time.monotonic()
+        for _ in range(num_cmds):
+            run(backend.shell_cmd("true"))
+        cmd_time = (time.monotonic() - start_time) / num_cmds
+    finally:
+        subprocess.run(backend.clean_cmd(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return (init_time, cmd_time)
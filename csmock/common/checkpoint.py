@@ -0,0 +1,184 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# local imports
+from csmock.common.payloads import file_digest
+from csmock.common.util import clone_file_with_stat
+
+# default directory where checkpoints of unfinished scans are stored
+CHECKPOINT_DIR = "/var/tmp/csmock/checkpoints"
+
+# prefix of names of the snapshots created for checkpoints
+CHECKPOINT_SNAPSHOT_PREFIX = "csmock-ckpt-"
+
+
+def scan_fingerprint(srpm, profile, plugins, pkgs, rpm_opts):
+    """return a digest of the inputs that need to match when resuming a scan"""
+    data = {
+        "srpm": file_digest(srpm) if srpm is not None and os.path.isfile(srpm) else None,
+        "profile": profile,
+        "plugins": sorted(plugins),
+        "pkgs": sorted(set(pkgs)),
+        "rpm_opts": rpm_opts,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf8")).hexdigest()
+
+
+def copy_missing(src, dst):
+    """copy function for shutil.copytree() that keeps files already present in dst"""
+    if not os.path.lexists(dst):
+        clone_file_with_stat(src, dst)
+
+
+class Checkpoints:
+    """checkpoints of the phases of a scan that allow to resume it after a failure
+
+    Each checkpoint consists of a snapshot of the buildroot (created by the
+    overlayfs plug-in of mock) and of a copy of the debug directory of the
+    results.  The checkpoints of a scan are stored in a directory derived from
+    the path of its results, so that `--resume` only needs the same path."""
+
+    def __init__(self, results, checkpoint_dir, output):
+        self.results = results
+        key = hashlib.sha256(os.path.realpath(output).encode("utf8")).hexdigest()[:16]
+        self.ckpt_dir = os.path.join(checkpoint_dir, key)
+        self.state_file = os.path.join(self.ckpt_dir, "state.json")
+        self.saved_dbgdir = os.path.join(self.ckpt_dir, "debug")
+        self.output = output
+
+        # names of the completed phases in the order they were completed
+        self.done = []
+
+        # number of snapshots left behind by a previous run that is not resumed
+        self.stale = 0
+        self.fingerprint = None
+
+    def get_mock_opts(self):
+        """return the options of mock needed to create and restore snapshots"""
+        return ["--enable-plugin=overlayfs",
+                f"--plugin-option=overlayfs:base_dir={os.path.join(self.ckpt_dir, 'overlay')}",
+                "--disable-plugin=root_cache"]
+
+    def save_state(self, fingerprint):
+        try:
+            os.makedirs(self.ckpt_dir, mode=0o755, exist_ok=True)
+            tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"output": self.output, "fingerprint": fingerprint,
+                           "updated": int(time.time()), "done": self.done}, f, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            self.results.error(f"failed to write checkpoint state {self.state_file}: {e}", ec=0)
+
+    def load(self, fingerprint, resume):
+        """load checkpoints of a previous run of the same scan (if resume is True)"""
+        self.fingerprint = fingerprint
+        self.results.ini_writer.append("checkpoint-dir", self.ckpt_dir)
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            if resume:
+                self.results.fatal_error(f"no checkpoints to resume the scan from: {e}")
+            state = {}
+
+        if not resume:
+            # start from scratch
+            self.stale = len(state.get("done", []))
+            return
+
+        if state.get("fingerprint") != fingerprint:
+            self.results.fatal_error("checkpoints were created by a scan with different inputs, "
+                                     "cannot resume")
+
+        self.done = state.get("done", [])
+
+    def snapshot_name(self, idx):
+        return f"{CHECKPOINT_SNAPSHOT_PREFIX}{idx}"
+
+    def resume(self, mock):
+        """restore the buildroot and results from the last checkpoint (if any)"""
+        if self.stale:
+            # remove checkpoints of the previous run
+            self.done = [None] * self.stale
+            self.drop_all(mock)
+            self.stale = 0
+
+        if not self.done:
+            return
+
+        last = self.done[-1]
+        self.results.print_with_ts(f"resuming scan after phase: {last}")
+        if mock.exec_mock_cmd(["--rollback-to", self.snapshot_name(len(self.done))], quiet=False) != 0:
+            self.results.fatal_error(f"failed to restore buildroot from checkpoint: {last}")
+
+        try:
+            shutil.copytree(self.saved_dbgdir, self.results.dbgdir,
+                            copy_function=copy_missing, dirs_exist_ok=True)
+        except (OSError, shutil.Error) as e:
+            self.results.error(f"failed to restore results from checkpoint: {e}", ec=0)
+
+        self.results.ini_writer.append("resumed-after", last)
+
+    def is_done(self, phase):
+        return phase in self.done
+
+    def mark(self, mock, phase):
+        """record phase as completed and snapshot the current state of the scan"""
+        idx = len(self.done) + 1
+        if mock.exec_mock_cmd(["--snapshot", self.snapshot_name(idx)], quiet=False) != 0:
+            self.results.error(f"failed to create checkpoint: {phase}", ec=0)
+            return
+
+        try:
+            tmp_dir = f"{self.saved_dbgdir}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            shutil.copytree(self.results.dbgdir, tmp_dir, copy_function=clone_file_with_stat)
+            shutil.rmtree(self.saved_dbgdir, ignore_errors=True)
+            os.rename(tmp_dir, self.saved_dbgdir)
+        except (OSError, shutil.Error) as e:
+            self.results.error(f"failed to save results for checkpoint: {e}", ec=0)
+            mock.exec_mock_cmd(["--remove-snapshot", self.snapshot_name(idx)])
+            return
+
+        self.done.append(phase)
+        self.save_state(self.fingerprint)
+
+    def drop_all(self, mock):
+        """remove all checkpoints (used once the scan has finished)
+
+        The overlay base_dir is in use by the buildroot that mock has entered,
+        so it is left for mock to remove while cleaning the buildroot."""
+        for idx in reversed(range(1, len(self.done) + 1)):
+            if mock.exec_mock_cmd(["--remove-snapshot", self.snapshot_name(idx)]) != 0:
+                self.results.error(f"failed to remove checkpoint snapshot: {self.snapshot_name(idx)}", ec=0)
+
+        self.done = []
+        shutil.rmtree(self.saved_dbgdir, ignore_errors=True)
+        try:
+            os.unlink(self.state_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.results.error(f"failed to remove checkpoint state {self.state_file}: {e}", ec=0)
@@ -0,0 +1,120 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import shlex
+import subprocess
+import uuid
+
+# local imports
+from csmock.common.util import strlist_to_shell_cmd
+
+# user that runs commands executed by `mock --unpriv`
+UNPRIV_USER = "mockbuild"
+
+
+class ChrootShell:
+    """long-lived `mock --shell` session used to run commands in the buildroot
+
+    Each command is executed by `sh -c` in the session with stdin redirected from
+    /dev/null.  Its exit code is reported back on stdout of the session after a
+    marker unique for the session.  The session holds the lock of mock on the
+    buildroot, so other commands of mock could block on it.  MockWrapper therefore
+    closes the session before it runs any other command of mock.  The session is
+    not thread-safe, so it is closed (and not reopened) while hooks or chroot
+    commands run concurrently, and it is never used outside of the main thread."""
+
+    def __init__(self, results, mock_cmd):
+        self.results = results
+        self.mock_cmd = mock_cmd
+        self.marker = f"csmock-shell-{uuid.uuid4().hex}:"
+        self.proc = None
+
+        # whether commands can be executed as an unprivileged user
+        self.can_unpriv = False
+
+    def open(self):
+        """start the session and return True if it is usable"""
+        self.proc = subprocess.Popen(self.mock_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=self.results.log_fd)
+
+        # check that the session works and whether we can switch to the unprivileged user
+        ec = self.send_cmd("command -v runuser >/dev/null", self.results.log_fd)
+        if ec is None:
+            self.results.error("failed to open a persistent shell in the buildroot", ec=0)
+            self.close()
+            return False
+
+        self.can_unpriv = (ec == 0)
+        return True
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        self.proc.wait()
+        self.proc = None
+
+    def send_cmd(self, cmd, out_fd, unpriv=False):
+        """run cmd in the session and return its exit code (None if the session died)"""
+        cmd = f"/bin/sh -c {shlex.quote(cmd)}"
+        if unpriv:
+            cmd = f"runuser -u {UNPRIV_USER} -- {cmd}"
+        try:
+            self.proc.stdin.write(f"{cmd} </dev/null; printf '\\n{self.marker}%d\\n' $?\n".encode("utf8"))
+            self.proc.stdin.flush()
+        except OSError:
+            return None
+
+        # forward the output of cmd till we see the marker with its exit code
+        pending = None
+        marker = self.marker.encode("utf8")
+        for line in iter(self.proc.stdout.readline, b""):
+            if line.startswith(marker):
+                if pending is not None and pending != b"\n":
+                    out_fd.write(pending.decode("utf8", errors="replace"))
+                out_fd.flush()
+                return int(line[len(marker):])
+            if pending is not None:
+                out_fd.write(pending.decode("utf8", errors="replace"))
+            pending = line
+
+        # the session has terminated
+        if pending is not None:
+            out_fd.write(pending.decode("utf8", errors="replace"))
+        return None
+
+    def exec_cmd(self, cmd, log_cmd, unpriv=False):
+        """the same as ScanResults.exec_cmd(log_cmd), but cmd is executed in the session"""
+        results = self.results
+        results.handle_ec()
+        results.print_with_ts(strlist_to_shell_cmd(log_cmd, escape_special=True))
+
+        results.subproc = self.proc
+        rv = self.send_cmd(cmd, results.log_fd, unpriv)
+        results.subproc = None
+        if rv is None:
+            # propagate the exit code of mock
+            rv = self.proc.wait() or 1
+            self.proc = None
+
+        results.log_fd.write("\n")
+        results.handle_rv(rv)
+        return rv
@@ -0,0 +1,133 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import hashlib
+import json
+import os
+import time
+
+# local imports
+from csmock.common.rootpool import srpm_requires
+
+# default directory where resolved build dependencies are cached across runs
+DEPS_CACHE_DIR = "/var/tmp/csmock/deps-cache"
+
+# checksums of the repository metadata the package manager in the buildroot works with
+REPOMD_CHECKSUM_CMD = "find /var/cache/dnf /var/cache/libdnf5 /var/cache/yum \
+-name repomd.xml -path '*/repodata/*' -exec sha256sum {} + 2>/dev/null | sort"
+
+# SRPMs with this requirement generate (part of) their build dependencies in %build
+DYNAMIC_BUILD_REQUIRES = "rpmlib(DynamicBuildRequires)"
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DepsCache:
+    """cache of the exact package sets installed as build dependencies of SRPMs
+
+    The entries are keyed by requirements of the SRPM, the mock profile, the
+    additional repositories, and checksums of the repository metadata available
+    in the buildroot.  A cache hit therefore means that the package manager would
+    resolve the same set of packages again."""
+
+    def __init__(self, results, cache_dir):
+        self.results = results
+        self.cache_dir = cache_dir
+
+        # whether the result of the first lookup has been recorded in scan.ini
+        self.reported = False
+
+    def key_for(self, mock, srpm, repos):
+        """compute the cache key for build deps of srpm (or None if not available)"""
+        requires = srpm_requires(self.results, srpm)
+        if requires is None:
+            return None
+
+        cmd = mock.get_mock_cmd(["--shell", REPOMD_CHECKSUM_CMD])
+        (ec, out) = self.results.get_cmd_output(cmd, shell=False)
+        repomd = sorted(line.split()[0] for line in out.splitlines() if line.strip())
+        if ec != 0 or not repomd:
+            # no repository metadata cached in the buildroot
+            return None
+
+        data = {
+            "profile": mock.mock_profile,
+            "requires": requires,
+            "repos": sorted(set(repos)),
+            "repomd": repomd,
+        }
+        if DYNAMIC_BUILD_REQUIRES in requires:
+            # the resolved set depends on the contents of the SRPM
+            data["srpm"] = file_checksum(srpm)
+
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf8"))
+        return digest.hexdigest()
+
+    def entry_file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def record_lookup(self, hit):
+        if self.reported:
+            return
+        self.reported = True
+        self.results.ini_writer.append("deps-cache", "hit" if hit else "miss")
+
+    def lookup(self, key):
+        """return the list of packages cached for key (or None if not available)"""
+        if key is None:
+            return None
+
+        try:
+            with open(self.entry_file(key)) as f:
+                pkgs = json.load(f)["pkgs"]
+        except (OSError, ValueError, KeyError):
+            pkgs = None
+
+        self.record_lookup(pkgs is not None)
+        return pkgs
+
+    def store(self, key, pkgs):
+        if key is None:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, mode=0o755, exist_ok=True)
+            entry_file = self.entry_file(key)
+            tmp_file = f"{entry_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"created": int(time.time()), "pkgs": sorted(pkgs)}, f, indent=2)
+            os.replace(tmp_file, entry_file)
+        except OSError as e:
+            self.results.error(f"failed to write build deps cache entry {key}: {e}", ec=0)
+
+    def drop(self, key):
+        if key is None:
+            return
+
+        try:
+            os.unlink(self.entry_file(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.results.error(f"failed to remove build deps cache entry {key}: {e}", ec=0)
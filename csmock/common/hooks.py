@@ -0,0 +1,203 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import concurrent.futures
+import os
+import threading
+import time
+
+# local imports
+from csmock.common.results      import FatalError
+
+# default number of hooks executed in parallel (1 means sequentially)
+DEFAULT_PARALLEL_HOOKS = 1
+
+# default number of post-process hooks executed in parallel (the converters run as
+# separate processes, so threads waiting for them are enough to use all CPUs)
+DEFAULT_POST_PROCESS_JOBS = os.cpu_count() or 1
+
+# how often we check for terminating signals while waiting for hooks [s]
+HOOK_WAITING_TICK = 1
+
+
+class HookDecl:
+    """what a hook (or a post-build chroot command) reads and writes
+
+    Paths are compared as strings (post-install hooks declare absolute paths in
+    the buildroot).  Only hooks declared as concurrent
+    can run in parallel with other hooks, and only if none of them writes a path
+    that the other one reads or writes.  Undeclared hooks run exclusively.
+    Hooks listed in after need to finish before the hook can start."""
+
+    def __init__(self, reads=(), writes=(), concurrent=False, after=()):
+        self.reads = list(reads)
+        self.writes = list(writes)
+        self.concurrent = concurrent
+        self.after = list(after)
+
+
+# declaration used for hooks that have not declared anything
+EXCLUSIVE_HOOK = HookDecl()
+
+
+def paths_overlap(a, b):
+    """return True if one of the paths is equal to or below the other one"""
+    a = a.rstrip("/") + "/"
+    b = b.rstrip("/") + "/"
+    return a.startswith(b) or b.startswith(a)
+
+
+def decls_conflict(d1, d2):
+    if not d1.concurrent or not d2.concurrent:
+        return True
+
+    for w in d1.writes:
+        if any(paths_overlap(w, p) for p in d2.reads + d2.writes):
+            return True
+
+    for w in d2.writes:
+        if any(paths_overlap(w, p) for p in d1.reads):
+            return True
+
+    return False
+
+
+class HookTask:
+    """a hook to be run by run_hook_dag()"""
+
+    def __init__(self, name, fn, decl, key=None):
+        self.name = name
+        self.fn = fn
+        self.decl = decl
+
+        # the hook (or command) the task was created for, referred to by HookDecl.after
+        self.key = key
+
+        # indexes of tasks that need to finish before this one can start
+        self.preds = set()
+
+
+def build_hook_dag(tasks):
+    """make each task depend on all preceding tasks it conflicts with
+
+    A conflicting pair of hooks runs in the order of registration.  Explicit
+    dependencies given by HookDecl.after are added on top of that."""
+    for (j, task) in enumerate(tasks):
+        task.preds = set(i for i in range(j) if decls_conflict(tasks[i].decl, task.decl))
+        task.preds |= set(i for (i, other) in enumerate(tasks)
+                          if other.key is not None and other.key in task.decl.after and i != j)
+    return tasks
+
+
+def run_hook_dag(results, tasks, max_workers):
+    """run tasks on a pool of max_workers threads, respecting their dependencies
+
+    The log of each task is written as a separate section of the main log.  Once a
+    task raises FatalError, no more tasks are started.  The error is raised again
+    after the running tasks have finished."""
+    build_hook_dag(tasks)
+
+    def run_task(task):
+        with results.log_section(task.name):
+            start = time.monotonic()
+            results.print_with_ts(f"running {task.name}")
+            task.fn()
+            results.print_with_ts(f"finished {task.name} in {time.monotonic() - start:.1f}s")
+
+    pending = list(range(len(tasks)))
+    done = set()
+    running = {}
+    first_error = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            if first_error is None:
+                # start all tasks whose dependencies are satisfied
+                for idx in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if tasks[idx].preds <= done:
+                        pending.remove(idx)
+                        running[executor.submit(run_task, tasks[idx])] = idx
+
+            if not running:
+                if pending and first_error is None:
+                    names = ", ".join(tasks[idx].name for idx in pending)
+                    results.fatal_error(f"cyclic dependencies between hooks: {names}")
+                break
+
+            (finished, _) = concurrent.futures.wait(
+                running, timeout=HOOK_WAITING_TICK, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                done.add(running.pop(future))
+                exc = future.exception()
+                if exc is not None and first_error is None:
+                    first_error = exc
+
+            try:
+                # eventually handle terminating signals
+                results.handle_ec()
+            except FatalError as e:
+                if first_error is None:
+                    first_error = e
+
+    if first_error is not None:
+        raise first_error
+
+
+class BackgroundHooks:
+    """tasks run by run_hook_dag() in a background thread"""
+
+    def __init__(self, results, name, tasks, max_workers, on_join=None):
+        self.results = results
+        self.name = name
+        self.tasks = tasks
+        self.max_workers = max_workers
+        self.thread = None
+        self.error = None
+
+        # called by join() in the joining thread once the tasks have succeeded
+        self.on_join = on_join
+
+    def start(self):
+        def run():
+            try:
+                run_hook_dag(self.results, self.tasks, self.max_workers)
+            except Exception as e:
+                self.error = e
+
+        self.results.print_with_ts(f"starting {len(self.tasks)} {self.name} hooks in background")
+        self.thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def join(self):
+        """wait for the tasks and raise their error (if any), do nothing if already joined"""
+        if self.thread is None:
+            return
+
+        start = time.monotonic()
+        while self.thread.is_alive():
+            self.thread.join(HOOK_WAITING_TICK)
+            # eventually handle terminating signals
+            self.results.handle_ec()
+
+        self.thread = None
+        self.results.print_with_ts(f"{self.name} hooks joined after waiting {time.monotonic() - start:.1f}s")
+        if self.error is not None:
+            raise self.error
+        if self.on_join is not None:
+            self.on_join()
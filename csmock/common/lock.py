@@ -0,0 +1,280 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import contextlib
+import fcntl
+import os
+import shlex
+import subprocess
+import threading
+import time
+
+# how often we check for terminating signals while blocked on a lock [s]
+SIGNAL_CHECK_TICK = 1
+
+# how long should we wait before checking a lock held by an old csmock again [s]
+LEGACY_WAITING_TICK = 60
+
+# bounds of the delay between checks of the queue that made no progress [s]
+QUEUE_POLL_MIN_DELAY = 0.1
+QUEUE_POLL_MAX_DELAY = 5
+
+
+def root_lock_name(root_name):
+    """return the base name of lock files of the buildroot named root_name"""
+    return f"/tmp/.csmock-{root_name.replace('/', '_')}"
+
+
+def root_is_dirty(name):
+    """return True if the buildroot is still being cleaned up by a deferred reaper"""
+    return os.path.exists(f"{name}.dirty")
+
+
+def pid_alive(pid):
+    return os.path.exists(f"/proc/{pid}")
+
+
+def wait_for_flock(fd, lock_type, results):
+    """block in flock() while still handling terminating signals delivered to csmock"""
+    waiter = threading.Thread(target=fcntl.flock, args=(fd, lock_type), daemon=True)
+    waiter.start()
+    while waiter.is_alive():
+        waiter.join(SIGNAL_CHECK_TICK)
+        results.handle_ec()
+
+
+class RootLock:
+    """lock of a mock buildroot shared by all csmock instances running on the host
+
+    Waiters are served in the order of their arrival.  The queue of their PIDs is
+    stored in <name>.queue, which is protected by flock() on <name>.metalock.  Each
+    queued process holds flock() on its own node file <name>.<pid> and waits in
+    flock() on the node file of its predecessor.  It is therefore woken up as soon
+    as the predecessor releases the lock, or dies.  A queued PID whose node file is
+    not locked by anybody is considered stale (this does not depend on whether the
+    PID has been reused by an unrelated process in the meantime).
+
+    The lock owner also writes its PID to <name>.lock (and holds flock() on it)
+    to stay compatible with older versions of csmock, which check and write the
+    file while holding flock() on <name>.metalock."""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock_file = f"{name}.lock"
+        self.meta_lock_file = f"{name}.metalock"
+        self.queue_file = f"{name}.queue"
+        self.dirty_file = f"{name}.dirty"
+        self.reaper_log = f"{name}.reaper.log"
+        self.pid = os.getpid()
+        self.node_file = self.node_file_by_pid(self.pid)
+        self.node_fd = None
+        self.lock_fd = None
+
+    def node_file_by_pid(self, pid):
+        return f"{self.name}.{pid}"
+
+    @contextlib.contextmanager
+    def queue_locked(self):
+        fd = os.open(self.meta_lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def node_is_held(self, pid):
+        """return True if the process queued as pid still holds flock() on its node file"""
+        if pid == self.pid:
+            return self.node_fd is not None
+
+        try:
+            fd = os.open(self.node_file_by_pid(pid), os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def read_queue(self):
+        """read the queue of waiting PIDs and drop PIDs whose node file is no longer locked"""
+        try:
+            with open(self.queue_file) as f:
+                pids = [int(line) for line in f if line.strip().isdigit()]
+        except OSError:
+            pids = []
+
+        queue = []
+        for pid in pids:
+            if self.node_is_held(pid):
+                queue.append(pid)
+            else:
+                # remove node file left behind by a process that was killed
+                with contextlib.suppress(OSError):
+                    os.unlink(self.node_file_by_pid(pid))
+        return queue
+
+    def write_queue(self, queue):
+        tmp_file = f"{self.queue_file}.{self.pid}"
+        with open(tmp_file, "w") as f:
+            for pid in queue:
+                f.write(f"{pid}\n")
+        os.replace(tmp_file, self.queue_file)
+
+    def read_owner(self):
+        try:
+            with open(self.lock_file) as f:
+                return f.readline().strip()
+        except OSError:
+            return ""
+
+    def acquire(self, results):
+        """wait till the buildroot is ours and return the number of seconds we waited"""
+        start_time = time.time()
+
+        # enqueue ourselves
+        with self.queue_locked():
+            queue = self.read_queue()
+            queue.append(self.pid)
+            self.write_queue(queue)
+            self.node_fd = os.open(self.node_file, os.O_RDWR | os.O_CREAT, 0o666)
+            fcntl.flock(self.node_fd, fcntl.LOCK_EX)
+
+        advice = False
+        last_pred = None
+        delay = QUEUE_POLL_MIN_DELAY
+        while True:
+            with self.queue_locked():
+                queue = self.read_queue()
+                if self.pid not in queue:
+                    # should not happen unless somebody has tampered with the queue
+                    queue.append(self.pid)
+                self.write_queue(queue)
+                idx = queue.index(self.pid)
+                if idx == 0:
+                    # we are at the head of the queue
+                    break
+
+                # open the node file of our predecessor while the queue is locked
+                pred = queue[idx - 1]
+                try:
+                    pred_fd = os.open(self.node_file_by_pid(pred), os.O_RDONLY)
+                except OSError:
+                    pred_fd = None
+
+            if pred == last_pred:
+                # no progress since the last check, back off
+                time.sleep(delay)
+                delay = min(2 * delay, QUEUE_POLL_MAX_DELAY)
+                results.handle_ec()
+            else:
+                delay = QUEUE_POLL_MIN_DELAY
+                if not advice:
+                    results.print_with_ts("tip: you can use --root-override=<directory> "
+                                          "to run this csmock instance in parallel")
+                    advice = True
+                results.print_with_ts(f"waiting till PID {pred} releases {self.lock_file} "
+                                      f"({idx} csmock instance(s) ahead of us)...")
+            last_pred = pred
+
+            if pred_fd is None:
+                # the predecessor has just left the queue
+                continue
+            try:
+                wait_for_flock(pred_fd, fcntl.LOCK_SH, results)
+            finally:
+                os.close(pred_fd)
+
+        # take the buildroot over (blocks in case its previous owner is still cleaning it up)
+        self.lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+        wait_for_flock(self.lock_fd, fcntl.LOCK_EX, results)
+
+        while True:
+            # check and write the legacy lock file while holding the lock of old csmock
+            with self.queue_locked():
+                owner = self.read_owner()
+                if not owner.isdigit() or int(owner) == self.pid or not pid_alive(int(owner)):
+                    with open(self.lock_file, "w") as f:
+                        f.write(f"{self.pid}\n")
+                    break
+
+            # the buildroot is used by an older version of csmock, which does not use flock()
+            results.print_with_ts(f"waiting till {self.lock_file} (PID {owner}) disappears...")
+            time.sleep(LEGACY_WAITING_TICK)
+            results.handle_ec()
+
+        if owner.isdigit() and int(owner) != self.pid:
+            results.print_with_ts(f"warning: purging stray lock file {self.lock_file} (PID {owner})")
+
+        if root_is_dirty(self.name):
+            # the reaper holds the lock till it finishes, so it must have been killed
+            results.print_with_ts(f"warning: removing stale {self.dirty_file}")
+            with contextlib.suppress(OSError):
+                os.unlink(self.dirty_file)
+
+        return time.time() - start_time
+
+    def release_deferred(self, results, cmds):
+        """release the buildroot once cmds (lists of arguments) have finished in a background reaper"""
+        if self.lock_fd is None:
+            self.release()
+            return
+
+        # mark the buildroot as dirty till the reaper finishes
+        with open(self.dirty_file, "w"):
+            pass
+
+        lock_file = shlex.quote(self.lock_file)
+        script = f"echo $$ > {lock_file}\n"
+        for cmd in cmds:
+            cmd = " ".join(shlex.quote(arg) for arg in cmd)
+            script += f"{cmd} || echo \"reaper: command failed with exit code $?\" >&2\n"
+        script += f"rm -f {shlex.quote(self.dirty_file)}\n"
+        script += f": > {lock_file}\n"
+
+        # the reaper inherits the file descriptor holding flock() on the lock file
+        with open(self.reaper_log, "a") as log:
+            reaper = subprocess.Popen(["/bin/sh", "-c", script], stdin=subprocess.DEVNULL,
+                                      stdout=log, stderr=subprocess.STDOUT,
+                                      pass_fds=[self.lock_fd], start_new_session=True)
+        results.print_with_ts(f"buildroot handed over to reaper (PID {reaper.pid}), "
+                              f"see {self.reaper_log}")
+        self.release(keep_lock_file=True)
+
+    def release(self, keep_lock_file=False):
+        with self.queue_locked():
+            queue = self.read_queue()
+            if self.pid in queue:
+                queue.remove(self.pid)
+            self.write_queue(queue)
+
+            if self.lock_fd is not None:
+                if not keep_lock_file and self.read_owner() == str(self.pid):
+                    with contextlib.suppress(OSError):
+                        os.unlink(self.lock_file)
+                os.close(self.lock_fd)
+                self.lock_fd = None
+
+            if self.node_fd is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(self.node_file)
+                os.close(self.node_fd)
+                self.node_fd = None
@@ -0,0 +1,194 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import time
+
+# local imports
+from csmock.common.util import clone_file
+from csmock.common.util import debug_config_value
+
+# default directory where payloads copied into buildroots are stored across runs
+PAYLOAD_STORE_DIR = "/var/tmp/csmock/payloads"
+
+# where the store is bind-mounted in the buildroot
+PAYLOAD_MOUNT_POINT = "/var/tmp/csmock-payloads"
+
+# smaller files are copied into the buildroot as they are
+PAYLOAD_MIN_SIZE = 1 << 20
+
+# payloads not used for this long are removed from the store [s]
+PAYLOAD_MAX_AGE = 30 * 24 * 3600
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PayloadStore:
+    """content-addressed store of files copied into buildroots
+
+    The store is bind-mounted read-only into the buildroot by the bind_mount
+    plug-in of mock.  Large regular files are then made available in the buildroot
+    by symlinks to the store, so that unchanged payloads are never copied again.
+    This is done only if the store is really mounted read-only in the buildroot.
+    Directories are always copied as they are.
+
+    The store can be used by multiple csmock instances in parallel.  Updates of
+    the store and its index are serialized by flock() on the lock file."""
+
+    def __init__(self, results, store_dir):
+        self.results = results
+        self.store_dir = store_dir
+        self.index_file = os.path.join(store_dir, "index.json")
+        self.lock_file = os.path.join(store_dir, ".lock")
+
+        # whether the store is mounted read-only in the buildroot (None if not checked yet)
+        self.read_only = None
+
+    def get_mock_opts(self, debug_config):
+        """return the options of mock needed to bind-mount the store read-only into the buildroot
+
+        The store is appended to the bind mounts configured in the mock profile,
+        which are read from the output of mock --debug-config.  None is returned
+        if they cannot be read."""
+        plugin_conf = debug_config_value(debug_config or "", "plugin_conf")
+        if not isinstance(plugin_conf, dict):
+            return None
+
+        dirs = list(plugin_conf.get("bind_mount_opts", {}).get("dirs", []))
+        dirs.append((self.store_dir, PAYLOAD_MOUNT_POINT, "ro"))
+        return ["--enable-plugin=bind_mount",
+                f"--plugin-option=bind_mount:dirs={dirs!r}"]
+
+    def check_read_only(self, mock):
+        """return True if the store is mounted read-only in the buildroot"""
+        if self.read_only is None:
+            # the mount point is the 5th field and its options the 6th field of mountinfo
+            cmd = mock.get_mock_cmd(["--chroot", "cat /proc/self/mountinfo"])
+            (ec, out) = self.results.get_cmd_output(cmd, shell=False)
+            opts = [line.split()[5] for line in out.splitlines()
+                    if len(line.split()) > 5 and line.split()[4] == PAYLOAD_MOUNT_POINT]
+            self.read_only = (ec == 0 and len(opts) > 0 and opts[-1].split(",")[0] == "ro")
+            if not self.read_only:
+                self.results.print_with_ts(f"payload store is not mounted read-only at "
+                                           f"{PAYLOAD_MOUNT_POINT}, copying payloads instead")
+        return self.read_only
+
+    @contextlib.contextmanager
+    def locked(self):
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def load_index(self):
+        try:
+            with open(self.index_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self, index):
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.index_file)
+
+    def prune(self, index):
+        """remove payloads that have not been used for PAYLOAD_MAX_AGE"""
+        min_mtime = time.time() - PAYLOAD_MAX_AGE
+        for name in os.listdir(self.store_dir):
+            path = os.path.join(self.store_dir, name)
+            if name.startswith(".") or path == self.index_file or os.path.getmtime(path) >= min_mtime:
+                continue
+            self.results.print_with_ts(f"removing unused payload from store: {name}")
+            os.unlink(path)
+
+        for (src, entry) in list(index.items()):
+            if not os.path.exists(os.path.join(self.store_dir, entry["name"])):
+                del index[src]
+
+    def add(self, index, src, st):
+        """store the regular file src (unless already stored) and return its name in the store"""
+        key = [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_mode]
+        entry = index.get(src)
+        if entry is not None and entry["stat"] == key \
+                and os.path.exists(os.path.join(self.store_dir, entry["name"])):
+            name = entry["name"]
+        else:
+            # the name covers the permissions, which are shared by all links to the payload
+            mode = stat.S_IMODE(st.st_mode)
+            name = "%s-%04o" % (file_digest(src), mode)
+            dst = os.path.join(self.store_dir, name)
+            if not os.path.exists(dst):
+                self.results.print_with_ts(f"adding payload to store: {src}")
+                tmp_file = f"{dst}.{os.getpid()}.tmp"
+                clone_file(src, tmp_file)
+                os.chmod(tmp_file, mode)
+                os.replace(tmp_file, dst)
+            index[src] = {"name": name, "stat": key}
+
+        # mark the payload as recently used
+        os.utime(os.path.join(self.store_dir, name))
+        return name
+
+    def split(self, files, links_dir, skip_prefix):
+        """split files to be copied into the buildroot to (files, links)
+
+        Large regular files are stored in the store and replaced by symlinks created
+        in links_dir.  The returned links are paths relative to links_dir."""
+        try:
+            os.makedirs(self.store_dir, mode=0o755, exist_ok=True)
+            with self.locked():
+                index = self.load_index()
+                self.prune(index)
+
+                copy_files = []
+                links = []
+                for src in files:
+                    st = os.lstat(src)
+                    if not stat.S_ISREG(st.st_mode) or st.st_size < PAYLOAD_MIN_SIZE \
+                            or src.startswith(skip_prefix):
+                        copy_files.append(src)
+                        continue
+
+                    name = self.add(index, src, st)
+                    link = src.lstrip("/")
+                    link_path = os.path.join(links_dir, link)
+                    os.makedirs(os.path.dirname(link_path), exist_ok=True)
+                    os.symlink(os.path.join(PAYLOAD_MOUNT_POINT, name), link_path)
+                    links.append(link)
+
+                self.save_index(index)
+            return (copy_files, links)
+
+        except OSError as e:
+            self.results.error(f"failed to use payload store {self.store_dir}: {e}", ec=0)
+            return (files, [])
@@ -0,0 +1,257 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import concurrent.futures
+import configparser
+import contextlib
+import hashlib
+import http.client
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import urllib.parse
+
+# local imports
+from csmock.common.util import clone_file
+from csmock.common.util import debug_config_value
+
+# default directory where prefetched RPMs are stored across runs
+PREFETCH_DIR = "/var/tmp/csmock/prefetch"
+
+# default number of RPMs downloaded in parallel
+DEFAULT_PREFETCH_JOBS = 8
+
+# how many redirects we follow while downloading a single RPM
+MAX_REDIRECTS = 5
+
+# network timeout while downloading [s]
+DOWNLOAD_TIMEOUT = 60
+
+
+class DownloadError(Exception):
+    pass
+
+
+def repo_gpg_keys(debug_config):
+    """return keys of enabled repositories with gpgcheck in the output of mock --debug-config
+
+    The keys are returned as a sorted list of local files.  None is returned if
+    the configuration cannot be read, or if any of the keys is not a local file."""
+    conf = debug_config_value(debug_config, "dnf.conf") or debug_config_value(debug_config, "yum.conf")
+    if not isinstance(conf, str):
+        return None
+
+    parser = configparser.ConfigParser(strict=False, interpolation=None)
+    try:
+        parser.read_string(conf)
+        gpgcheck = parser.getboolean("main", "gpgcheck", fallback=False)
+        keys = set()
+        for section in parser.sections():
+            if section == "main" or not parser.getboolean(section, "enabled", fallback=True):
+                continue
+            if not parser.getboolean(section, "gpgcheck", fallback=gpgcheck):
+                continue
+
+            urls = parser.get(section, "gpgkey", fallback="").replace(",", " ").split()
+            if not urls:
+                return None
+            for url in urls:
+                if not url.startswith("file://") or re.search(r"[${]", url):
+                    return None
+                keys.add(url[len("file://"):])
+
+    except (ValueError, configparser.Error):
+        return None
+
+    return sorted(keys)
+
+
+class Prefetcher:
+    """download RPMs to be installed into the buildroot in parallel
+
+    The RPMs are stored in a directory shared by all scans using the same mock
+    profile, in a subdirectory given by a hash of the URL of the repository they
+    come from.  Each of them is verified by `rpm -K` before it is published there
+    under its final name, and again each time it is reused.  If any repository of
+    the mock profile has gpgcheck enabled, the RPMs also need to be signed by one
+    of the keys of such repositories.  Prefetching is disabled if the keys are not
+    available as local files, so that the package manager verifies the signatures
+    of the RPMs it downloads itself."""
+
+    def __init__(self, results, prefetch_dir, mock_profile, jobs):
+        self.results = results
+        self.repo_dir = os.path.join(prefetch_dir, os.path.basename(mock_profile))
+        self.jobs = jobs
+
+        # HTTP(S) connections of the current thread by (scheme, host)
+        self.local = threading.local()
+
+        # whether the downloaded RPMs can be verified (None if not decided yet)
+        self.verifiable = None
+
+        # database of rpm with the keys used to verify signatures (None if not required)
+        self.keyring = None
+
+    def init_verification(self, debug_config):
+        """decide how the downloaded RPMs are verified, return False if they cannot be"""
+        keys = None if debug_config is None else repo_gpg_keys(debug_config)
+        if keys is None:
+            self.results.print_with_ts("signing keys of the mock profile not available, "
+                                       "prefetching disabled")
+            return False
+
+        if not keys:
+            # gpgcheck is disabled for all repositories, verify digests only
+            return True
+
+        keyring = tempfile.mkdtemp(prefix="prefetch-keyring-", dir=self.results.tmpdir)
+        for key in keys:
+            cmd = ["rpm", f"--dbpath={keyring}", "--import", key]
+            if self.results.exec_cmd(cmd) != 0:
+                self.results.error(f"failed to import signing key {key}, prefetching disabled", ec=0)
+                return False
+
+        self.keyring = keyring
+        return True
+
+    def verify(self, path):
+        """return True if the RPM is intact (and signed by a trusted key if required)"""
+        if self.keyring is None:
+            cmd = ["rpm", "-K", "--nosignature", "--quiet", path]
+            return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+        # rpm -K succeeds for unsigned RPMs, so look for a signature verified by a key in our keyring
+        cmd = ["rpm", f"--dbpath={self.keyring}", "-Kv", path]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        return proc.returncode == 0 \
+            and re.search(r"Signature, key ID [0-9a-f]+: OK$", proc.stdout, flags=re.MULTILINE) is not None
+
+    def resolve(self, mock, specs):
+        """return URLs of the given packages and of their dependencies missing in the buildroot"""
+        if self.verifiable is None:
+            self.verifiable = self.init_verification(mock.get_debug_config())
+        if not self.verifiable:
+            return None
+
+        cmd = mock.get_mock_cmd(["--pm-cmd", "download", "--url", "--resolve"] + specs)
+        (ec, out) = self.results.get_cmd_output(cmd, shell=False)
+        if ec != 0:
+            return None
+
+        return [line.strip() for line in out.splitlines()
+                if re.match(r"^(https?|ftp|file)://.*\.rpm$", line.strip())]
+
+    def get_connection(self, scheme, host):
+        conns = getattr(self.local, "conns", None)
+        if conns is None:
+            conns = self.local.conns = {}
+
+        conn = conns.get((scheme, host))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[(scheme, host)] = cls(host, timeout=DOWNLOAD_TIMEOUT)
+        return conn
+
+    def drop_connection(self, scheme, host):
+        conn = self.local.conns.pop((scheme, host), None)
+        if conn is not None:
+            conn.close()
+
+    def download(self, url, dst):
+        """download url to dst, reusing connections of the current thread"""
+        for _ in range(MAX_REDIRECTS):
+            parsed = urllib.parse.urlsplit(url)
+            if parsed.scheme == "file":
+                clone_file(urllib.parse.unquote(parsed.path), dst)
+                return
+            if parsed.scheme not in ["http", "https"]:
+                raise DownloadError(f"unsupported URL: {url}")
+
+            path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+            conn = self.get_connection(parsed.scheme, parsed.netloc)
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                # the server might have closed a kept-alive connection, try a new one
+                self.drop_connection(parsed.scheme, parsed.netloc)
+                conn = self.get_connection(parsed.scheme, parsed.netloc)
+                conn.request("GET", path)
+                resp = conn.getresponse()
+
+            if resp.status in [301, 302, 303, 307, 308]:
+                resp.read()
+                url = urllib.parse.urljoin(url, resp.getheader("Location"))
+                continue
+
+            if resp.status != 200:
+                resp.read()
+                raise DownloadError(f"HTTP status {resp.status}: {url}")
+
+            with open(dst, "wb") as f:
+                while True:
+                    chunk = resp.read(1 << 20)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            return
+
+        raise DownloadError(f"too many redirects: {url}")
+
+    def fetch_one(self, url):
+        """make the RPM available in the local repository and return its path"""
+        (repo_url, name) = url.rsplit("/", 1)
+        name = urllib.parse.unquote(name)
+        dst_dir = os.path.join(self.repo_dir, hashlib.sha256(repo_url.encode("utf8")).hexdigest()[:16])
+        dst = os.path.join(dst_dir, name)
+        if os.path.exists(dst) and self.verify(dst):
+            # already downloaded by a previous scan
+            return dst
+
+        os.makedirs(dst_dir, mode=0o755, exist_ok=True)
+        tmp_file = os.path.join(dst_dir, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.download(url, tmp_file)
+            if not self.verify(tmp_file):
+                raise DownloadError(f"verification failed: {url}")
+            os.replace(tmp_file, dst)
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_file)
+        return dst
+
+    def fetch(self, urls):
+        """download urls in parallel and return paths of the local RPMs (None on failure)"""
+        os.makedirs(self.repo_dir, mode=0o755, exist_ok=True)
+        self.results.print_with_ts(f"prefetching {len(urls)} RPMs to {self.repo_dir} "
+                                   f"using {self.jobs} parallel jobs...")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [executor.submit(self.fetch_one, url) for url in urls]
+            paths = []
+            failed = False
+            for future in futures:
+                try:
+                    paths.append(future.result())
+                except (OSError, http.client.HTTPException, DownloadError) as e:
+                    self.results.error(f"failed to prefetch RPM: {e}", ec=0)
+                    failed = True
+
+        return None if failed else list(dict.fromkeys(paths))
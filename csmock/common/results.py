@@ -17,6 +17,7 @@
 
 # standard imports
 import codecs
+import contextlib
 import datetime
 import errno
 import os
@@ -29,6 +30,7 @@ import stat
 import subprocess
 import sys
 import tempfile
+import threading
 
 # local imports
 from csmock.common.util         import strlist_to_shell_cmd
@@ -63,6 +65,16 @@ class ScanResults:
         self.ec = 0
         self.dying = False
 
+        # set if the scan is going to be repeated, no output is written then
+        self.discard = False
+
+        # serializes updates of the shared state by threads running in parallel
+        self.lock = threading.RLock()
+
+        # per-thread log files and child processes (see log_section())
+        self.local = threading.local()
+        self.subprocs = {}
+
         # just to silence pylint, will be initialized in __enter__()
         self.tmpdir = None
         self.resdir = None
@@ -70,9 +82,8 @@ class ScanResults:
         self.dbgdir_raw = None
         self.dbgdir_uni = None
         self.log_pid = None
-        self.log_fd = None
+        self.main_log_fd = None
         self.ini_writer = None
-        self.subproc = None
 
         m = re.match("^(.*)\\.xz$", self.dirname)
         if m is not None:
@@ -123,10 +134,10 @@ class ScanResults:
             # avoid throwing FatalError out of a signal handler
             self.dying = True
             self.error("caught signal %d" % signum, 128 + signum)
-            if self.subproc is not None:
-                # forward the signal to the child process being executed
+            for subproc in list(self.subprocs.values()):
+                # forward the signal to the child processes being executed
                 try:
-                    os.kill(self.subproc.pid, signum)
+                    os.kill(subproc.pid, signum)
                 except Exception as e:
                     self.error("failed to kill child process: %s" % e)
             # this will make the foreground process throw FatalError synchronously
@@ -147,7 +158,11 @@ class ScanResults:
         self.log_fd.close()
         self.log_fd = sys.stderr
         self.log_pid.wait()
-        if self.use_tar:
+        if self.discard:
+            if not self.use_tar:
+                # do not leave partial results at the final path
+                shutil.rmtree(self.resdir, ignore_errors=True)
+        elif self.use_tar:
             tar_opts = "-c --remove-files"
             if self.use_xz:
                 tar_opts += " -J"
@@ -159,7 +174,8 @@ class ScanResults:
                     "failed to write '%s', not removing '%s'..." % (
                         self.output, self.tmpdir))
 
-        sys.stderr.write("Wrote: %s\n\n" % self.output)
+        if not self.discard:
+            sys.stderr.write("Wrote: %s\n\n" % self.output)
         if self.no_clean:
             return
 
@@ -170,6 +186,50 @@ class ScanResults:
                     % (self.tool, self.tmpdir))
 
 
+    @property
+    def log_fd(self):
+        """log of the current thread (the main log unless inside of log_section())"""
+        fd = getattr(self.local, "log_fd", None)
+        return fd if fd is not None else self.main_log_fd
+
+    @log_fd.setter
+    def log_fd(self, fd):
+        self.main_log_fd = fd
+
+    @property
+    def subproc(self):
+        """child process being executed by the current thread"""
+        return self.subprocs.get(threading.get_ident())
+
+    @subproc.setter
+    def subproc(self, proc):
+        if proc is None:
+            self.subprocs.pop(threading.get_ident(), None)
+        else:
+            self.subprocs[threading.get_ident()] = proc
+
+    @contextlib.contextmanager
+    def log_section(self, title):
+        """capture the log of the current thread and append it to the main log at once
+
+        This keeps the output of tasks running in parallel threads readable."""
+        (fd, path) = tempfile.mkstemp(prefix="log-section-", dir=self.tmpdir)
+        os.close(fd)
+
+        # O_APPEND keeps the output of child processes and our own writes in order
+        self.local.log_fd = open(path, "a", encoding="utf8", errors="replace")
+        try:
+            yield
+        finally:
+            self.local.log_fd.close()
+            self.local.log_fd = None
+            with self.lock, open(path, encoding="utf8", errors="replace") as f:
+                self.main_log_fd.write(f"=== begin of {title} ===\n")
+                shutil.copyfileobj(f, self.main_log_fd)
+                self.main_log_fd.write(f"=== end of {title} ===\n")
+                self.main_log_fd.flush()
+            os.unlink(path)
+
     def print_with_ts(self, msg, prefix=">>> "):
         self.log_fd.write("%s%s\t%s\n" % (prefix, current_iso_date(), msg))
         self.log_fd.flush()
@@ -177,8 +237,9 @@ class ScanResults:
         self.handle_ec()
 
     def update_ec(self, ec):
-        if self.ec < ec:
-            self.ec = ec
+        with self.lock:
+            if self.ec < ec:
+                self.ec = ec
 
     def error(self, msg, ec=1, err_prefix="", fatal=False):
         if fatal:
@@ -255,6 +316,10 @@ class IniWriter:
     def __init__(self, results):
         self.results = results
         self.ini = self.results.open_res_file("scan.ini")
+
+        # (key, value) pairs appended since start_recording() (None if not recording)
+        self.recorded = None
+
         self.write("[scan]\n")
         self.append("tool", self.results.tool)
         self.append("tool-version", self.results.tool_version)
@@ -272,12 +337,25 @@ class IniWriter:
         self.ini = None
 
     def write(self, text):
-        self.ini.write(text)
-        self.results.log_fd.write("scan.ini: " + text)
+        with self.results.lock:
+            self.ini.write(text)
+            self.results.log_fd.write("scan.ini: " + text)
 
     def append(self, key, value):
         val_str = str(value).strip()
-        self.write("%s = %s\n" % (key, val_str))
+        with self.results.lock:
+            self.write("%s = %s\n" % (key, val_str))
+            if self.recorded is not None:
+                self.recorded.append((key, val_str))
+
+    def start_recording(self):
+        self.recorded = []
+
+    def stop_recording(self):
+        """return the (key, value) pairs appended since start_recording()"""
+        recorded = self.recorded
+        self.recorded = None
+        return recorded
 
 
 def re_from_checker_set(checker_set):
@@ -0,0 +1,240 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import glob
+import hashlib
+import json
+import os
+import time
+
+# local imports
+from csmock.common.util import query_srpm
+
+# default directory where snapshots of pooled buildroots are stored across runs
+ROOT_POOL_DIR = "/var/tmp/csmock/root-pool"
+
+# default maximal number of snapshots kept in the pool for a single mock root
+DEFAULT_ROOT_POOL_SIZE = 8
+
+# directory where the buildroot prepared by the first scan of a differential scan is stored
+DIFF_ROOT_POOL_DIR = "/var/tmp/csmock/diff-root-pool"
+
+# prefix of names of the snapshots created by csmock
+SNAPSHOT_PREFIX = "csmock-pool-"
+
+# the pool is shared by all scans (restore from and store to the pool)
+POOL_MODE_SHARED = "shared"
+
+# always prepare the buildroot from scratch and snapshot it for a subsequent scan
+POOL_MODE_CREATE = "create"
+
+# restore the buildroot if possible and remove all snapshots of the pool on exit
+POOL_MODE_CONSUME = "consume"
+
+
+def repomd_checksums(pkg_cache_dir):
+    """return sorted checksums of repository metadata cached in pkg_cache_dir on the host"""
+    checksums = []
+    for path in glob.glob(os.path.join(pkg_cache_dir, "**", "repodata", "repomd.xml"), recursive=True):
+        try:
+            with open(path, "rb") as f:
+                checksums.append(hashlib.sha256(f.read()).hexdigest())
+        except OSError:
+            continue
+    return sorted(checksums)
+
+
+def srpm_requires(results, srpm):
+    """return the sorted list of requirements of the given SRPM"""
+    if srpm is None:
+        return []
+
+    info = query_srpm(results, srpm)
+    if info is None:
+        return None
+
+    return info[1]
+
+
+class RootPool:
+    """pool of copy-on-write snapshots of buildroots with build dependencies installed
+
+    The snapshots are created and restored by the overlayfs plug-in of mock.  They
+    are keyed by mock profile, a hash of the set of packages that were requested
+    to be installed into the buildroot, and checksums of the repository metadata
+    in the package cache of the mock profile.  A snapshot is therefore not reused
+    once the package manager has seen an update of the repositories."""
+
+    def __init__(self, results, pool_dir, max_size, root_name, mode=POOL_MODE_SHARED):
+        self.results = results
+        self.pool_dir = pool_dir
+        self.max_size = max_size
+        self.mode = mode
+        self.index_file = os.path.join(pool_dir, "index", f"{root_name.replace('/', '_')}.json")
+
+        # key of the snapshot the buildroot is currently based on
+        self.current = None
+
+        # whether the result of the first lookup has been recorded in scan.ini
+        self.reported = False
+
+    def get_mock_opts(self):
+        """return the options of mock needed to create and restore snapshots"""
+        return ["--enable-plugin=overlayfs",
+                f"--plugin-option=overlayfs:base_dir={self.pool_dir}",
+                "--disable-plugin=root_cache"]
+
+    def key_for(self, profile, srpm, pkgs, add_repos, pkg_cache_dir):
+        """compute the pool key for the given buildroot contents (or None if not available)"""
+        requires = srpm_requires(self.results, srpm)
+        if requires is None or pkg_cache_dir is None:
+            return None
+
+        repomd = repomd_checksums(pkg_cache_dir)
+        if not repomd:
+            # no repository metadata cached for the mock profile yet
+            return None
+
+        data = {
+            "profile": profile,
+            "requires": requires,
+            "pkgs": sorted(set(pkgs)),
+            "repos": sorted(set(add_repos)),
+            "repomd": repomd,
+        }
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf8"))
+        return SNAPSHOT_PREFIX + digest.hexdigest()[:16]
+
+    def load_index(self):
+        try:
+            with open(self.index_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"snapshots": {}, "hits": 0, "misses": 0}
+
+    def save_index(self, index):
+        try:
+            os.makedirs(os.path.dirname(self.index_file), mode=0o755, exist_ok=True)
+            tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            self.results.error(f"failed to write root pool index {self.index_file}: {e}", ec=0)
+
+    def record_lookup(self, index, hit):
+        """update hit/miss stats of the pool (only the first lookup of a scan counts)"""
+        if self.reported:
+            return
+        self.reported = True
+
+        stat = "hits" if hit else "misses"
+        index[stat] = index.get(stat, 0) + 1
+        self.results.ini_writer.append("root-pool", "hit" if hit else "miss")
+        self.results.ini_writer.append("root-pool-hits", index.get("hits", 0))
+        self.results.ini_writer.append("root-pool-misses", index.get("misses", 0))
+
+    def snapshot_exists(self, mock, key):
+        """return True if mock still knows the snapshot named key"""
+        cmd = mock.get_mock_cmd(["--list-snapshots"])
+        (ec, out) = self.results.get_cmd_output(cmd, shell=False)
+        return ec == 0 and key in out.split()
+
+    def invalidate(self):
+        """forget all snapshots of the pool (e.g. after they were wiped by mock --scrub)"""
+        index = self.load_index()
+        index["snapshots"] = {}
+        self.current = None
+        self.save_index(index)
+
+    def restore(self, mock, key):
+        """restore the buildroot from a snapshot matching key, return True on success"""
+        if key is None:
+            return False
+
+        if key == self.current:
+            if self.snapshot_exists(mock, key):
+                # the buildroot is already based on the matching snapshot
+                return True
+            self.current = None
+
+        if self.mode == POOL_MODE_CREATE:
+            # never reuse a snapshot created by somebody else
+            return False
+
+        index = self.load_index()
+        snapshots = index.setdefault("snapshots", {})
+        hit = key in snapshots
+        if hit:
+            self.results.print_with_ts(f"restoring buildroot from snapshot: {key}")
+            if mock.exec_mock_cmd(["--rollback-to", key], quiet=False) == 0:
+                snapshots[key]["last-used"] = int(time.time())
+                self.current = key
+            else:
+                self.results.error(f"failed to restore buildroot from snapshot: {key}", ec=0)
+                del snapshots[key]
+                hit = False
+
+        self.record_lookup(index, hit)
+        self.save_index(index)
+        return hit
+
+    def store(self, mock, key):
+        """snapshot the current state of the buildroot under key"""
+        if key is None or key == self.current or self.mode == POOL_MODE_CONSUME:
+            return
+
+        index = self.load_index()
+        snapshots = index.setdefault("snapshots", {})
+        if key in snapshots:
+            # replace a stale snapshot with the same key
+            mock.exec_mock_cmd(["--remove-snapshot", key])
+            del snapshots[key]
+
+        if mock.exec_mock_cmd(["--snapshot", key], quiet=False) != 0:
+            self.results.error(f"failed to create buildroot snapshot: {key}", ec=0)
+            return
+
+        now = int(time.time())
+        snapshots[key] = {"created": now, "last-used": now}
+        self.current = key
+
+        # evict the least recently used snapshots if the pool is too big
+        lru = sorted(snapshots, key=lambda name: snapshots[name]["last-used"])
+        for name in lru[:max(0, len(lru) - self.max_size)]:
+            self.results.print_with_ts(f"evicting buildroot snapshot from pool: {name}")
+            if mock.exec_mock_cmd(["--remove-snapshot", name]) == 0:
+                del snapshots[name]
+
+        self.save_index(index)
+
+    def drop_all(self, mock):
+        """remove all snapshots of the pool (used on exit in the consume mode)"""
+        if self.mode != POOL_MODE_CONSUME:
+            return
+
+        index = self.load_index()
+        snapshots = index.setdefault("snapshots", {})
+        for name in list(snapshots):
+            if mock.exec_mock_cmd(["--remove-snapshot", name]) == 0:
+                del snapshots[name]
+            else:
+                self.results.error(f"failed to remove buildroot snapshot: {name}", ec=0)
+
+        self.current = None
+        self.save_index(index)
@@ -0,0 +1,336 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import contextlib
+import fcntl
+import json
+import os
+import re
+import threading
+import uuid
+
+# how csmock decides whether to place the buildroot on tmpfs
+TMPFS_MODES = ["auto", "always", "never"]
+
+# fraction of the host memory used as the default budget for tmpfs shared by all scans
+TMPFS_BUDGET_RATIO = 0.5
+
+# directory with memory reservations of buildroots on tmpfs of all csmock instances on the host
+TMPFS_RESERVATIONS_DIR = "/tmp/.csmock-tmpfs"
+
+# peak usage of tmpfs measured by previous scans of each package [MiB]
+TMPFS_USAGE_FILE = "/var/tmp/csmock/tmpfs-usage.json"
+
+# the size of tmpfs reserved for a package is its measured peak usage multiplied by this
+TMPFS_USAGE_MARGIN = 1.25
+
+# smallest tmpfs worth using for a package without measured usage [MiB]
+# (a minimal buildroot with a compiler installed takes several hundred MiB)
+TMPFS_MIN_SIZE = 1024
+
+# tmpfs filled up to this fraction of its size is considered overflowed
+TMPFS_FULL_RATIO = 0.95
+
+# how often the usage of tmpfs is sampled [s]
+TMPFS_SAMPLING_INTERVAL = 5
+
+
+class TmpfsOverflow(Exception):
+    """raised on exit from the buildroot if its tmpfs overflowed (the scan needs to be repeated on disk)"""
+    pass
+
+
+def parse_size_mb(val):
+    """parse size like 4096, 512M, or 8G and return it in MiB (used as argparse type)"""
+    m = re.match(r"^([0-9]+)([MmGg]?)$", val)
+    if m is None:
+        raise ValueError(f"invalid size: {val}")
+    size = int(m.group(1))
+    if m.group(2) in ["G", "g"]:
+        size *= 1024
+    return size
+
+
+def meminfo_mb(field):
+    """return the given field of /proc/meminfo in MiB (or None if not known)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                m = re.match(rf"^{field}:\s+([0-9]+) kB$", line.strip())
+                if m:
+                    return int(m.group(1)) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def package_name(srpm):
+    """return name of the package built from srpm (or basename of the given file)"""
+    base = os.path.basename(srpm)
+    m = re.match(r"^(.+)-[^-]+-[^-]+\.src\.rpm$", base)
+    return m.group(1) if m else base
+
+
+@contextlib.contextmanager
+def flocked(lock_file):
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+class TmpfsReservation:
+    """memory reserved for a buildroot on tmpfs, shared by all csmock instances on the host
+
+    Each reservation is a file in TMPFS_RESERVATIONS_DIR holding the reserved size
+    in MiB.  Its owner holds flock() on it.  A reservation file that is not locked
+    by anybody was left behind by a process that was killed.  The reservations are
+    created while holding flock() on the .lock file in the directory."""
+
+    def __init__(self, res_dir=TMPFS_RESERVATIONS_DIR):
+        self.res_dir = res_dir
+        self.fd = None
+        self.path = None
+
+    def reserved_by_others(self):
+        total = 0
+        for name in os.listdir(self.res_dir):
+            path = os.path.join(self.res_dir, name)
+            if name.startswith(".") or path == self.path:
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # the owner is alive
+                    with os.fdopen(os.dup(fd)) as f:
+                        total += int(f.read().strip() or 0)
+                    continue
+
+                # remove reservation left behind by a process that was killed
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+            except ValueError:
+                continue
+            finally:
+                os.close(fd)
+        return total
+
+    def reserve(self, size_fn):
+        """reserve size_fn(free) MiB of the free budget (nothing if it returns None)"""
+        os.makedirs(self.res_dir, exist_ok=True)
+        with contextlib.suppress(OSError):
+            os.chmod(self.res_dir, 0o1777)
+
+        with flocked(os.path.join(self.res_dir, ".lock")):
+            size = size_fn(self.reserved_by_others())
+            if size is None:
+                return None
+
+            self.path = os.path.join(self.res_dir, f"{os.getpid()}.{uuid.uuid4().hex}")
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            os.write(self.fd, f"{size}\n".encode())
+            return size
+
+    def release(self):
+        if self.fd is None:
+            return
+        with contextlib.suppress(OSError):
+            os.unlink(self.path)
+        os.close(self.fd)
+        self.fd = None
+        self.path = None
+
+
+def load_usage(usage_file=TMPFS_USAGE_FILE):
+    try:
+        with open(usage_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_usage(name, peak_mb, usage_file=TMPFS_USAGE_FILE):
+    """remember peak usage of tmpfs by a scan of the package name"""
+    os.makedirs(os.path.dirname(usage_file), exist_ok=True)
+    with flocked(f"{usage_file}.lock"):
+        usage = load_usage(usage_file)
+        usage[name] = peak_mb
+        tmp_file = f"{usage_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(usage, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, usage_file)
+
+
+def is_tmpfs_mount(path):
+    try:
+        with open("/proc/self/mounts") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 2 and fields[1] == path and fields[2] == "tmpfs":
+                    return True
+    except OSError:
+        pass
+    return False
+
+
+class TmpfsRoot:
+    """placement of a buildroot on tmpfs managed by the tmpfs plug-in of mock
+
+    The decision is made once per scan before the buildroot is created.  All
+    buildroots on tmpfs on the host share a single memory budget.  Each scan
+    reserves the size its tmpfs is capped at.  In the auto mode, the size needed
+    is the peak usage of tmpfs measured by the last scan of the same package with
+    a safety margin added.  A package without a measurement gets whatever is left
+    of the budget.  If the size does not fit into the rest of the budget, the
+    buildroot is placed on disk.  If the tmpfs overflows, the scan is repeated
+    with the buildroot on disk (see TmpfsOverflow)."""
+
+    def __init__(self, results, mode, budget_mb=None, res_dir=TMPFS_RESERVATIONS_DIR,
+                 usage_file=TMPFS_USAGE_FILE):
+        self.results = results
+        self.mode = mode
+        self.budget_mb = budget_mb
+        self.reservation = TmpfsReservation(res_dir)
+        self.usage_file = usage_file
+        self.name = None
+
+        # size of the tmpfs in MiB (None if the buildroot is on disk)
+        self.size_mb = None
+
+        # peak usage of the tmpfs in bytes
+        self.peak_usage = 0
+        self.monitor = None
+        self.stop_event = threading.Event()
+
+    def needed_size(self, free):
+        """return the size of tmpfs to use if free MiB are left of the budget (None for disk)"""
+        if self.mode == "always":
+            return free if free > 0 else None
+
+        peak = load_usage(self.usage_file).get(self.name)
+        if peak is None:
+            # no measurement available, take the rest of the budget
+            if free < TMPFS_MIN_SIZE:
+                self.results.print_with_ts(f"buildroot kept on disk: only {free} MiB left of the tmpfs budget")
+                return None
+            return free
+
+        needed = int(peak * TMPFS_USAGE_MARGIN)
+        if free < needed:
+            self.results.print_with_ts(f"buildroot kept on disk: {needed} MiB needed by {self.name} "
+                                       f"(measured by a previous scan) but only {free} MiB left "
+                                       f"of the tmpfs budget")
+            return None
+        return needed
+
+    def plan(self, srpm):
+        """decide whether to use tmpfs for a buildroot where srpm is going to be built"""
+        if self.mode == "never":
+            return
+
+        self.name = package_name(srpm or "")
+        avail = meminfo_mb("MemAvailable")
+        budget = self.budget_mb
+        if budget is None:
+            total = meminfo_mb("MemTotal")
+            budget = None if total is None else int(total * TMPFS_BUDGET_RATIO)
+        if avail is None or budget is None:
+            self.results.error("unable to determine available memory, not using tmpfs", ec=0)
+            return
+
+        try:
+            # never use more than what is available right now
+            self.size_mb = self.reservation.reserve(
+                lambda reserved: self.needed_size(min(budget - reserved, avail)))
+        except OSError as e:
+            self.results.error(f"failed to reserve memory for tmpfs: {e}", ec=0)
+
+        if self.size_mb is None:
+            self.results.ini_writer.append("tmpfs", "no")
+            return
+
+        self.results.print_with_ts(f"placing buildroot on tmpfs limited to {self.size_mb} MiB")
+        self.results.ini_writer.append("tmpfs", f"{self.size_mb}M")
+
+    def get_mock_opts(self):
+        """return options of mock that place the buildroot on tmpfs (if planned)"""
+        if self.size_mb is None:
+            return []
+        return ["--enable-plugin=tmpfs",
+                f"--plugin-option=tmpfs:max_fs_size={self.size_mb}m"]
+
+    def sample(self, root):
+        if not is_tmpfs_mount(root):
+            # not mounted (yet)
+            return
+        st = os.statvfs(root)
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        self.peak_usage = max(self.peak_usage, used)
+
+    def monitor_loop(self, root):
+        stopped = False
+        while not stopped:
+            # take one more sample after being stopped
+            stopped = self.stop_event.wait(TMPFS_SAMPLING_INTERVAL)
+            try:
+                self.sample(root)
+            except OSError:
+                pass
+
+    def start_monitor(self, root):
+        """start sampling the usage of tmpfs mounted at root"""
+        if self.size_mb is None or root is None or self.monitor is not None:
+            return
+        self.monitor = threading.Thread(target=self.monitor_loop, args=(root,), daemon=True)
+        self.monitor.start()
+
+    def stop_monitor(self):
+        """stop sampling and record the peak usage in scan.ini
+
+        Return True if the tmpfs overflowed."""
+        if self.monitor is None:
+            return False
+        self.stop_event.set()
+        self.monitor.join()
+        self.monitor = None
+
+        peak_mb = self.peak_usage >> 20
+        self.results.ini_writer.append("tmpfs-peak-usage", f"{peak_mb}M")
+        overflow = (peak_mb >= self.size_mb * TMPFS_FULL_RATIO)
+        if overflow:
+            # we only know that more was needed, so double the size for the next scan
+            self.results.error(f"tmpfs of the buildroot overflowed ({peak_mb} MiB used)", ec=0)
+            peak_mb = 2 * self.size_mb
+
+        try:
+            record_usage(self.name, peak_mb, self.usage_file)
+        except OSError as e:
+            self.results.error(f"failed to record usage of tmpfs: {e}", ec=0)
+        return overflow
+
+    def release(self):
+        """return the reserved memory to the shared budget"""
+        self.reservation.release()
@@ -15,9 +15,25 @@
 # You should have received a copy of the GNU General Public License
 # along with csmock.  If not, see <http://www.gnu.org/licenses/>.
 
+import ast
+import contextlib
+import errno
+import fcntl
 import os
 import re
 import shlex
+import shutil
+
+try:
+    import rpm
+except ImportError:
+    rpm = None
+
+# ioctl() to share data blocks of two files (see ioctl_ficlone(2))
+FICLONE = 0x40049409
+
+# query format to list files and requirements of a source package
+SRPM_INFO_QF = "[F:%{BASENAMES}\\n][R:%{REQUIRENAME} %{REQUIREFLAGS:depflags} %{REQUIREVERSION}\\n]"
 
 
 def shell_quote(str_in):
@@ -147,7 +163,147 @@ def dirs_to_scan_by_args(parser, args, props, tool):
     return ' '.join(dirs_to_scan)
 
 
+def debug_config_value(debug_config, key):
+    """return the value of config_opts[key] in the output of mock --debug-config
+
+    The value may span multiple lines because mock pretty-prints it.  None is
+    returned if the key is missing or its value is not a Python literal."""
+    prefix = f"config_opts[{key!r}] = "
+    lines = debug_config.splitlines()
+    for (idx, line) in enumerate(lines):
+        if not line.startswith(prefix):
+            continue
+
+        # continuation lines are indented
+        value = [line[len(prefix):]]
+        for cont in lines[idx + 1:]:
+            if not cont[:1].isspace():
+                break
+            value.append(cont)
+
+        try:
+            return ast.literal_eval("\n".join(value))
+        except (SyntaxError, ValueError):
+            return None
+
+    return None
+
+
 def require_file(parser, name):
     """Print an error and exit unsuccessfully if 'name' is not a file"""
     if not os.path.isfile(name):
         parser.error(f"'{name}' is not a file")
+
+
+def clone_file(src, dst):
+    """copy src to dst sharing its data blocks if the file system supports reflinks"""
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return
+    except OSError:
+        pass
+
+    # reflinks not supported, fall back to an ordinary copy
+    shutil.copyfile(src, dst)
+
+
+def clone_file_with_stat(src, dst):
+    clone_file(src, dst)
+    shutil.copystat(src, dst)
+
+
+def move_tree(src, dst):
+    """move file or directory src to dst, which may be on a different file system
+
+    Directories are created at dst and all other entries are moved one by one,
+    so an entry that we are not allowed to move (e.g. in a directory created by
+    another user) makes the move fail without walking the tree in advance.  In
+    that case, the entries moved so far are moved back, the partial copy at dst
+    is removed, and the error is raised."""
+    renamed = []
+    copied = []
+
+    def move_entry(src_path, dst_path):
+        try:
+            os.rename(src_path, dst_path)
+            renamed.append((src_path, dst_path))
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+        # copy the data (sharing the data blocks if possible), the source is removed at the end
+        try:
+            if os.path.islink(src_path):
+                os.symlink(os.readlink(src_path), dst_path)
+            else:
+                clone_file_with_stat(src_path, dst_path)
+        except OSError:
+            if os.path.lexists(dst_path):
+                os.unlink(dst_path)
+            raise
+        copied.append(src_path)
+
+    dirs = []
+    try:
+        if os.path.isdir(src) and not os.path.islink(src):
+            for (dirpath, dirnames, filenames) in os.walk(src):
+                dst_dir = dst + dirpath[len(src):]
+                os.mkdir(dst_dir)
+                dirs.append((dirpath, dst_dir))
+
+                # symlinks to directories are listed in dirnames but not walked into
+                links = [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]
+                for name in filenames + links:
+                    move_entry(os.path.join(dirpath, name), os.path.join(dst_dir, name))
+        else:
+            move_entry(src, dst)
+
+    except OSError:
+        # move back what has been moved and do not leave a partial copy behind
+        for (src_path, dst_path) in reversed(renamed):
+            with contextlib.suppress(OSError):
+                os.rename(dst_path, src_path)
+        if dirs:
+            shutil.rmtree(dst, ignore_errors=True)
+        raise
+
+    # the contents of the directories are complete, copy their permissions and timestamps
+    for (src_dir, dst_dir) in reversed(dirs):
+        shutil.copystat(src_dir, dst_dir, follow_symlinks=False)
+
+    for path in copied:
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+    if dirs:
+        shutil.rmtree(src, ignore_errors=True)
+
+
+def query_srpm(results, srpm):
+    """return (files, requires) of the given SRPM, or None if it cannot be read
+
+    The header is read in-process if the rpm module of Python is available."""
+    if rpm is not None:
+        ts = rpm.TransactionSet()
+        ts.setVSFlags(rpm._RPMVSF_NOSIGNATURES | rpm._RPMVSF_NODIGESTS)
+        try:
+            with open(srpm, "rb") as f:
+                hdr = ts.hdrFromFdno(f.fileno())
+            out = hdr.format(SRPM_INFO_QF)
+        except (OSError, rpm.error):
+            return None
+    else:
+        (ec, out) = results.get_cmd_output(["rpm", "-qp", "--qf", SRPM_INFO_QF, srpm], shell=False)
+        if ec != 0:
+            return None
+
+    files = []
+    requires = set()
+    for line in out.splitlines():
+        if line.startswith("F:"):
+            files.append(line[2:])
+        elif line.startswith("R:"):
+            requires.add(" ".join(line[2:].split()))
+
+    return (files, sorted(requires))
@@ -64,7 +64,7 @@ class Plugin:
 
         severity_filter = dict(zip(self._severity_levels, ['-l', '-ll', '-lll']))[args.bandit_severity_filter.upper()]
         run_cmd = f"shopt -s nullglob && {RUN_BANDIT_SH} {severity_filter} {dirs_to_scan} > {BANDIT_CAPTURE}"
-        props.post_build_chroot_cmds += [run_cmd]
+        props.add_source_scan(run_cmd, reads=dirs_to_scan.split(), writes=[BANDIT_CAPTURE])
         props.copy_out_files += [BANDIT_CAPTURE]
 
         csmock.common.util.install_default_toolver_hook(props, "bandit")
@@ -76,3 +76,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
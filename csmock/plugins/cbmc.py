@@ -130,3 +130,4 @@ class Plugin:
             
             return results.exec_cmd(cmd, shell=True)
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
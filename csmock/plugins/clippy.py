@@ -54,3 +54,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [convert_hook]
+        props.declare_hook(convert_hook, concurrent=True)
@@ -134,3 +134,4 @@ class Plugin:
             cmd = f"cd '{src_dir}' && touch empty.conv && csgrep --mode=json --remove-duplicates *.conv > '{dst}'"
             return results.exec_cmd(cmd, shell=True)
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
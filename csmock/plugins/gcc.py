@@ -326,6 +326,7 @@ class Plugin:
                         cmd = f'{FILTER_CMD} --file-glob "{src}/*.sarif" > "{dst}"'
                         return results.exec_cmd(cmd, shell=True)
                     props.post_process_hooks += [filter_hook]
+                    props.declare_hook(filter_hook, concurrent=True)
 
                 # XXX: changing props this way is extremely fragile
                 # insert csgcca right before cswrap to avoid chaining
@@ -369,3 +370,4 @@ class Plugin:
                 return results.exec_cmd(cmd, shell=True)
 
             props.post_process_hooks += [ubsan_filter_hook]
+            props.declare_hook(ubsan_filter_hook, concurrent=True)
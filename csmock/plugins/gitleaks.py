@@ -143,10 +143,11 @@ class Plugin:
                 cmd += " --config-path=%s" % gitleaks_config
 
             cmd += " 2>%s" % GITLEAKS_LOG
-            props.post_build_chroot_cmds += [cmd]
+            props.add_source_scan(cmd, reads=[GITLEAKS_SCAN_DIR], writes=[GITLEAKS_OUTPUT, GITLEAKS_LOG])
             return 0
 
         props.pre_mock_hooks += [fetch_gitleaks_hook]
+        props.declare_hook(fetch_gitleaks_hook, concurrent=True)
 
         def filter_hook(results):
             src = results.dbgdir_raw + GITLEAKS_OUTPUT
@@ -155,3 +156,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
@@ -139,6 +139,7 @@ class Plugin:
             return mock.exec_chroot_cmd(filter_cmd, quiet=False)
 
         props.post_install_hooks += [run_analysis_hook]
+        props.declare_hook(run_analysis_hook, writes=[INFER_OUT_DIR, INFER_RESULTS], concurrent=True)
 
         def filter_hook(results):
             src = results.dbgdir_raw + INFER_RESULTS
@@ -147,3 +148,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True, echo=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
@@ -59,7 +59,7 @@ class Plugin:
 
         props.install_pkgs += ["pylint"]
         cmd = f"shopt -s nullglob && {RUN_PYLINT_SH} {dirs_to_scan} > {PYLINT_CAPTURE}"
-        props.post_build_chroot_cmds += [cmd]
+        props.add_source_scan(cmd, reads=dirs_to_scan.split(), writes=[PYLINT_CAPTURE])
         props.copy_out_files += [PYLINT_CAPTURE]
 
         csmock.common.util.install_default_toolver_hook(props, "pylint")
@@ -71,3 +71,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
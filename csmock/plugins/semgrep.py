@@ -151,6 +151,7 @@ class Plugin:
             return 0
 
         props.pre_mock_hooks += [prepare_semgrep_runtime_hook]
+        props.declare_hook(prepare_semgrep_runtime_hook, concurrent=True)
 
         def scan_hook(results, mock, props):  # pylint: disable=unused-argument
             semgrep_lib_dir = os.path.join(results.tmpdir, "semgrep_lib")
@@ -195,8 +196,8 @@ class Plugin:
 
             return 0
 
-        # run semgrep scan after successful build
-        props.post_install_hooks += [scan_hook]
+        # run semgrep scan after successful build (or after %prep with --scan-sources-early)
+        props.add_source_scan(scan_hook, reads=[SEMGREP_SCAN_DIR], writes=[SEMGREP_SCAN_OUTPUT, SEMGREP_SCAN_LOG])
 
         # convert the results into the csdiff's JSON format
         def filter_hook(results):
@@ -221,3 +222,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
@@ -72,7 +72,8 @@ class Plugin:
             parser, args, props, "shellcheck")
 
         # append "/*" to each directory in dirs_to_scan (to scan pkg-specific dirs)
-        dirs_to_scan = " ".join([dir + "/*" for dir in dirs_to_scan.split()])
+        scan_dirs = dirs_to_scan.split()
+        dirs_to_scan = " ".join([dir + "/*" for dir in scan_dirs])
 
         props.install_pkgs += ["ShellCheck"]
         cmd = "shopt -s nullglob && "
@@ -80,7 +81,7 @@ class Plugin:
         cmd += f"SC_BATCH={args.shellcheck_batch} "
         cmd += f"SC_TIMEOUT={args.shellcheck_timeout} "
         cmd += f"{RUN_SHELLCHECK_SH} {dirs_to_scan}"
-        props.post_build_chroot_cmds += [cmd]
+        props.add_source_scan(cmd, reads=scan_dirs, writes=[SHELLCHECK_CAP_DIR])
         props.copy_out_files += [SHELLCHECK_CAP_DIR]
 
         csmock.common.util.install_default_toolver_hook(props, "ShellCheck")
@@ -92,3 +93,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
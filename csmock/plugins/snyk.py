@@ -173,6 +173,7 @@ class Plugin:
 
         # fetch snyk binary executable before initializing the buildroot
         props.pre_mock_hooks += [fetch_snyk_hook]
+        props.declare_hook(fetch_snyk_hook, concurrent=True)
 
         def scan_hook(results, mock, props):
             # copy snyk authentication token into the chroot
@@ -220,8 +221,9 @@ class Plugin:
             # returning non-zero would prevent csmock from archiving SNYK_LOG
             return 0
 
-        # run snyk after successful build
-        props.post_install_hooks += [scan_hook]
+        # run snyk after successful build (or after %prep with --scan-sources-early)
+        props.add_source_scan(scan_hook, reads=[SNYK_SCAN_DIR],
+                              writes=["/builddir/.config/configstore", SNYK_OUTPUT, SNYK_LOG])
 
         # convert the results into the csdiff's JSON format
         def filter_hook(results):
@@ -238,3 +240,5 @@ class Plugin:
             return snyk_write_analysis_meta(results, raw_results_file)
 
         props.post_process_hooks += [write_snyk_stats_metadata, filter_hook]
+        props.declare_hook(write_snyk_stats_metadata, concurrent=True)
+        props.declare_hook(filter_hook, concurrent=True, after=[write_snyk_stats_metadata])
@@ -65,6 +65,7 @@ class Plugin:
             results.ini_writer.append("analyzer-version-unicontrol", "0.0.2")
             return 0
         props.pre_mock_hooks += [write_toolver_hook]
+        props.declare_hook(write_toolver_hook, concurrent=True)
 
         # dependency of UNICONTROL_SCRIPT
         props.install_opt_pkgs += ["python3-magic", "python3-six"]
@@ -82,7 +83,7 @@ class Plugin:
             cmd += " --notests"
 
         cmd += " >%s 2>%s" % (UNICONTROL_OUTPUT, UNICONTROL_LOG)
-        props.post_build_chroot_cmds += [cmd]
+        props.add_source_scan(cmd, reads=[UNICONTROL_SCAN_DIR], writes=[UNICONTROL_OUTPUT, UNICONTROL_LOG])
         props.copy_out_files += [UNICONTROL_OUTPUT, UNICONTROL_LOG]
 
         def filter_hook(results):
@@ -92,3 +93,4 @@ class Plugin:
             return results.exec_cmd(cmd, shell=True)
 
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True)
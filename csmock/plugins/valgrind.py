@@ -108,6 +108,7 @@ class Plugin:
             return results.exec_cmd(["find", results.dbgdir_raw + VALGRIND_CAPTURE_DIR,
                 "-name", "pid-*.log", "-empty", "-delete"])
         props.post_process_hooks += [cleanup_hook]
+        props.declare_hook(cleanup_hook, concurrent=True)
 
         # transform XML files produced by valgrind into csdiff format
         def filter_hook(results):
@@ -121,3 +122,4 @@ class Plugin:
             cmd = f"cd '{src_dir}' && csgrep --mode=json --quiet --remove-duplicates *.xml > '{dst}'"
             return results.exec_cmd(cmd, shell=True)
         props.post_process_hooks += [filter_hook]
+        props.declare_hook(filter_hook, concurrent=True, after=[cleanup_hook])
@@ -0,0 +1,120 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import contextlib
+import importlib.machinery
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+# make the csmock package importable without installing it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+CSMOCK_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "..", "csmock", "csmock")
+
+# local imports
+from csmock.common.results import FatalError  # noqa: E402
+
+
+class FakeIniWriter:
+    def __init__(self):
+        self.entries = {}
+
+    def append(self, key, value):
+        self.entries[key] = value
+
+
+class FakeResults:
+    """minimal stand-in for ScanResults that records messages instead of logging them"""
+
+    def __init__(self, tmpdir):
+        self.tmpdir = str(tmpdir)
+        self.messages = []
+        self.errors = []
+        self.keep_going = False
+        self.ini_writer = FakeIniWriter()
+
+    def print_with_ts(self, msg):
+        self.messages.append(msg)
+
+    def error(self, msg, ec=1, fatal=False):
+        self.errors.append(msg)
+        if ec != 0 and (fatal or not self.keep_going):
+            raise FatalError(ec)
+
+    def fatal_error(self, msg, ec=1):
+        self.error(msg, ec=ec, fatal=True)
+
+    def handle_ec(self):
+        pass
+
+    @contextlib.contextmanager
+    def log_section(self, title):
+        yield
+
+    def exec_cmd(self, cmd, shell=False):
+        return subprocess.run(cmd, shell=shell).returncode
+
+    def get_cmd_output(self, cmd, shell=True):
+        proc = subprocess.run(cmd, shell=shell, stdout=subprocess.PIPE, universal_newlines=True)
+        return (proc.returncode, proc.stdout)
+
+
+@pytest.fixture
+def results(tmp_path):
+    return FakeResults(tmp_path)
+
+
+@pytest.fixture
+def csmock_main():
+    """the csmock script loaded as a module"""
+    loader = importlib.machinery.SourceFileLoader("csmock_main", CSMOCK_SCRIPT)
+    spec = importlib.util.spec_from_loader("csmock_main", loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def run_main(csmock_main, monkeypatch, tmp_path):
+    """return a function running main() of csmock with the given arguments
+
+    The function returns ScanProps and the output passed to do_scan()."""
+    def run_main(argv):
+        scans = []
+
+        def do_scan(props, output):
+            scans.append((props, output))
+            return 0
+
+        # mock is not needed to parse the command line, only a configuration file of the profile
+        profile = tmp_path / "fedora-44-x86_64.cfg"
+        profile.write_text("")
+
+        monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+        monkeypatch.setattr(sys, "argv", ["csmock", "-r", str(profile)] + argv)
+        with pytest.raises(SystemExit) as exc:
+            csmock_main.main()
+        assert exc.value.code == 0
+        [(props, output)] = scans
+        return (props, output)
+
+    return run_main
@@ -0,0 +1,129 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import os
+import subprocess
+import sys
+
+import pytest
+
+# local imports
+from csmock.common.backend import BWRAP_UNPRIV_ID
+from csmock.common.backend import BackendError
+from csmock.common.backend import BwrapBackend
+from csmock.common.backend import MockBackend
+from csmock.common.backend import passwd_ids
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    base_dir = tmp_path / "base"
+    (base_dir / "etc").mkdir(parents=True)
+    (base_dir / "etc" / "passwd").write_text("root:x:0:0::/root:/bin/sh\nmockbuild:x:1001:135::/builddir:/bin/sh\n")
+    return base_dir
+
+
+@pytest.fixture
+def bwrap(base_dir, tmp_path):
+    return BwrapBackend(str(base_dir), str(tmp_path / "work"))
+
+
+def test_passwd_ids(base_dir, tmp_path):
+    assert passwd_ids(str(base_dir), "mockbuild") == (1001, 135)
+    assert passwd_ids(str(base_dir), "nobody") is None
+    assert passwd_ids(str(tmp_path / "missing"), "mockbuild") is None
+
+    # the default ids are used if the user is not found in the base tree
+    assert BwrapBackend(str(tmp_path), str(tmp_path)).unpriv_ids == (BWRAP_UNPRIV_ID, BWRAP_UNPRIV_ID)
+
+
+def test_translate(bwrap):
+    assert bwrap.translate(["--init"]) == bwrap.init_cmd()
+    assert bwrap.translate(["--clean"]) == bwrap.clean_cmd()
+    assert bwrap.translate(["--scrub=all"]) == bwrap.clean_cmd()
+    assert bwrap.translate(["--shell"]) == bwrap.shell_cmd(None)
+    assert bwrap.translate(["--shell", "ls"]) == bwrap.shell_cmd("ls")
+    assert bwrap.translate(["--chroot", "ls"]) == bwrap.shell_cmd("ls")
+    assert bwrap.translate(["--unpriv", "--chroot", "ls"]) == bwrap.shell_cmd("ls", unpriv=True)
+    assert bwrap.translate(["--copyin", "a", "b", "/dst"]) == bwrap.copy_in_cmd(["a", "b"], "/dst")
+    assert bwrap.translate(["--copyout", "/src", "dst"]) == bwrap.copy_out_cmd(["/src"], "dst")
+    assert bwrap.translate(["--print-root-path"]) == ["echo", bwrap.upper_dir]
+
+    # options without any effect on the bwrap backend are dropped
+    assert bwrap.translate(["--quiet", "--install", "gcc", "--addrepo", "http://repo", "make"]) \
+        == bwrap.install_cmd(["gcc", "make"])
+
+
+@pytest.mark.parametrize("args", [["--rebuild", "foo.src.rpm"], ["--install"], ["--copyin", "a"], []])
+def test_translate_unsupported(bwrap, args):
+    with pytest.raises(BackendError):
+        bwrap.translate(args)
+
+
+def test_shell_cmd(bwrap):
+    cmd = bwrap.shell_cmd("ls")
+    assert cmd[0] == "bwrap"
+    assert cmd[-3:] == ["/bin/sh", "-c", "ls"]
+    assert cmd[cmd.index("--uid") + 1] == "0"
+
+    cmd = bwrap.shell_cmd("ls", unpriv=True)
+    assert cmd[cmd.index("--uid") + 1] == "1001"
+    assert cmd[cmd.index("--gid") + 1] == "135"
+
+
+def test_clean_cmd(bwrap):
+    # the work dir of overlayfs contains directories without any permissions
+    os.makedirs(os.path.join(bwrap.overlay_work_dir, "work"))
+    os.makedirs(os.path.join(bwrap.upper_dir, "builddir"))
+    os.chmod(os.path.join(bwrap.overlay_work_dir, "work"), 0)
+
+    assert subprocess.run(bwrap.clean_cmd()).returncode == 0
+    assert not os.path.exists(bwrap.upper_dir)
+    assert not os.path.exists(bwrap.overlay_work_dir)
+
+
+def test_mock_backend():
+    def_cmd = ["mock", "-r", "fedora-44-x86_64"]
+    backend = MockBackend(def_cmd)
+    assert backend.translate(["--rebuild", "foo.src.rpm"]) == def_cmd + ["--rebuild", "foo.src.rpm"]
+    assert backend.shell_cmd("ls", unpriv=True) == def_cmd + ["--unpriv", "--chroot", "ls"]
+
+    # the default arguments are shared with MockWrapper
+    def_cmd.append("--quiet")
+    assert backend.init_cmd() == def_cmd + ["--init"]
+
+
+def test_backend_option(run_main, tmp_path):
+    srpm = tmp_path / "foo-1.0-1.fc44.src.rpm"
+    srpm.write_bytes(b"")
+    (props, _) = run_main([str(srpm)])
+    assert props.backend == "mock"
+
+    (props, _) = run_main(["--backend=bwrap", "--bwrap-base-dir", str(tmp_path), str(srpm)])
+    assert props.backend == "bwrap"
+    assert props.bwrap_base_dir == os.path.realpath(tmp_path)
+
+
+@pytest.mark.parametrize("opts", [["--backend=bwrap", "--root-pool"], ["--backend=bwrap", "--checkpoint"],
+                                  ["--bwrap-base-dir", "/base"]])
+def test_backend_option_conflicts(csmock_main, monkeypatch, tmp_path, capsys, opts):
+    monkeypatch.setattr(sys, "argv", ["csmock"] + opts + [str(tmp_path / "foo.src.rpm")])
+    with pytest.raises(SystemExit) as exc:
+        csmock_main.main()
+    assert exc.value.code == 2
+    assert "bwrap" in capsys.readouterr().err
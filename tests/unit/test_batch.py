@@ -0,0 +1,133 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import argparse
+import os
+import sys
+
+import pytest
+
+
+def write_srpms(srpm_dir, names):
+    srpm_dir.mkdir(exist_ok=True)
+    for name in names:
+        (srpm_dir / name).write_bytes(b"")
+    return [str(srpm_dir / name) for name in names]
+
+
+def test_batch_srpm_list(csmock_main, monkeypatch, tmp_path):
+    parser = argparse.ArgumentParser()
+    srpm_dir = tmp_path / "srpms"
+    write_srpms(srpm_dir, ["b-1-1.src.rpm", "a-1-1.src.rpm", "README"])
+    assert csmock_main.batch_srpm_list(parser, str(srpm_dir)) \
+        == [str(srpm_dir / "a-1-1.src.rpm"), str(srpm_dir / "b-1-1.src.rpm")]
+
+    # a file with one SRPM per line, comments and empty lines are ignored
+    srpm_list = tmp_path / "list"
+    srpm_list.write_text("# SRPMs to scan\nb-1-1.src.rpm\n\n  /tmp/a-1-1.src.rpm  \n")
+    monkeypatch.chdir(tmp_path)
+    assert csmock_main.batch_srpm_list(parser, str(srpm_list)) \
+        == [str(tmp_path / "b-1-1.src.rpm"), "/tmp/a-1-1.src.rpm"]
+
+    # no SRPMs found
+    srpm_list.write_text("# nothing\n")
+    with pytest.raises(SystemExit):
+        csmock_main.batch_srpm_list(parser, str(srpm_list))
+
+
+@pytest.fixture
+def run_batch(csmock_main, monkeypatch, tmp_path, capsys):
+    """return a function running main() of csmock with --batch, which returns (exit code, batch jobs)"""
+    def run_batch(argv):
+        batches = []
+
+        def do_batch_scan(props, jobs, output_dir, slots, lookahead, diff_patches):
+            batches.append(jobs)
+            return 0
+
+        profile = tmp_path / "fedora-44-x86_64.cfg"
+        profile.write_text("")
+
+        monkeypatch.setattr(csmock_main, "do_batch_scan", do_batch_scan)
+        monkeypatch.setattr(sys, "argv", ["csmock", "-r", str(profile)] + argv)
+        with pytest.raises(SystemExit) as exc:
+            csmock_main.main()
+        return (exc.value.code, batches[0] if batches else None, capsys.readouterr().err)
+
+    return run_batch
+
+
+def test_batch_jobs(run_batch, tmp_path):
+    srpm_dir = tmp_path / "srpms"
+    srpms = write_srpms(srpm_dir, ["foo-1.0-1.src.rpm", "bar-2.0-1.src.rpm"])
+    out_dir = tmp_path / "out"
+    (ec, jobs, _) = run_batch(["--batch", str(srpm_dir), "-o", str(out_dir)])
+    assert ec == 0
+    assert jobs == [(srpms[1], str(out_dir / "bar-2.0-1.tar.xz")),
+                    (srpms[0], str(out_dir / "foo-1.0-1.tar.xz"))]
+
+    # existing results are not overwritten without --force
+    out_dir.mkdir()
+    (out_dir / "foo-1.0-1.tar.xz").write_bytes(b"")
+    (ec, jobs, err) = run_batch(["--batch", str(srpm_dir), "-o", str(out_dir)])
+    assert ec == 2
+    assert "already exists" in err
+
+
+def test_batch_duplicate_nvr(run_batch, tmp_path):
+    srpms = write_srpms(tmp_path / "a", ["foo-1.0-1.src.rpm"]) + write_srpms(tmp_path / "b", ["foo-1.0-1.src.rpm"])
+    srpm_list = tmp_path / "list"
+    srpm_list.write_text("\n".join(srpms))
+    (ec, jobs, err) = run_batch(["--batch", str(srpm_list), "-o", str(tmp_path / "out")])
+    assert ec == 2
+    assert jobs is None
+    assert "duplicate NVR 'foo-1.0-1'" in err
+
+
+@pytest.mark.parametrize("opts", [["foo.src.rpm"], ["--batch-slots=0"], ["--batch-lookahead=-1"],
+                                  ["--base-srpm", "foo.src.rpm"]])
+def test_batch_option_conflicts(run_batch, tmp_path, opts):
+    srpms = write_srpms(tmp_path / "srpms", ["foo-1.0-1.src.rpm"])
+    (ec, jobs, _) = run_batch(["--batch", srpms[0]] + opts)
+    assert ec == 2
+    assert jobs is None
+
+
+def test_do_batch_scan(csmock_main, monkeypatch, tmp_path):
+    def do_scan(props, output):
+        # record the buildroot the scan ran in
+        with open(output, "w") as f:
+            f.write(props.mock_root_override)
+        return 1 if "bar" in props.srpm else 0
+
+    monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+    props = csmock_main.ScanProps()
+    props.mock_profile = "fedora-44-x86_64"
+    names = ["foo-1.0-1", "bar-2.0-1", "baz-3.0-1"]
+    out_dir = tmp_path / "out"
+    jobs = [(f"/srpms/{name}.src.rpm", str(out_dir / f"{name}.tar.xz")) for name in names]
+    assert csmock_main.do_batch_scan(props, jobs, str(out_dir), 2, 0, diff_patches=False) == 1
+
+    # each scan ran in one of the buildroots of the batch slots
+    for name in names:
+        assert (out_dir / f"{name}.tar.xz").read_text() in ["fedora-44-x86_64-batch0", "fedora-44-x86_64-batch1"]
+
+    # the summary lists the scans in the order they were given
+    lines = (out_dir / "batch-summary.txt").read_text().splitlines()
+    assert [line.split("\t")[0] for line in lines[1:]] == ["0", "1", "0"]
+    assert [line.split("\t")[2] for line in lines[1:]] == [srpm for (srpm, _) in jobs]
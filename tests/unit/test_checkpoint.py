@@ -0,0 +1,80 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import os
+
+# local imports
+from csmock.common.checkpoint import Checkpoints
+
+
+class FakeMock:
+    def __init__(self):
+        self.cmds = []
+
+    def exec_mock_cmd(self, cmd, quiet=True):
+        self.cmds.append(cmd)
+        return 0
+
+
+def make_checkpoints(results, tmp_path):
+    results.dbgdir = str(tmp_path / "debug")
+    os.makedirs(results.dbgdir)
+    with open(os.path.join(results.dbgdir, "scan.ini"), "w") as f:
+        f.write("[scan]\n")
+    return Checkpoints(results, str(tmp_path / "ckpt"), str(tmp_path / "out.tar.xz"))
+
+
+def test_drop_all_keeps_overlay(results, tmp_path):
+    ckpt = make_checkpoints(results, tmp_path)
+    ckpt.load("fp", resume=False)
+    mock = FakeMock()
+    ckpt.mark(mock, "install")
+    ckpt.mark(mock, "build")
+
+    # the overlay base_dir is populated by mock
+    overlay = os.path.join(ckpt.ckpt_dir, "overlay")
+    os.makedirs(overlay)
+    assert os.path.exists(ckpt.state_file)
+    assert os.path.isdir(ckpt.saved_dbgdir)
+
+    ckpt.drop_all(mock)
+    assert mock.cmds[-2:] == [["--remove-snapshot", "csmock-ckpt-2"], ["--remove-snapshot", "csmock-ckpt-1"]]
+    assert not os.path.exists(ckpt.state_file)
+    assert not os.path.exists(ckpt.saved_dbgdir)
+    assert os.path.isdir(overlay)
+    assert not ckpt.done
+    assert not results.errors
+
+
+def test_stale_checkpoints_keep_overlay(results, tmp_path):
+    ckpt = make_checkpoints(results, tmp_path)
+    ckpt.load("fp", resume=False)
+    mock = FakeMock()
+    ckpt.mark(mock, "install")
+    overlay = os.path.join(ckpt.ckpt_dir, "overlay")
+    os.makedirs(overlay)
+
+    # a new scan that does not resume drops the checkpoints of the previous run
+    ckpt = Checkpoints(results, str(tmp_path / "ckpt"), str(tmp_path / "out.tar.xz"))
+    ckpt.load("fp", resume=False)
+    assert ckpt.stale == 1
+    mock = FakeMock()
+    ckpt.resume(mock)
+    assert mock.cmds == [["--remove-snapshot", "csmock-ckpt-1"]]
+    assert not os.path.exists(ckpt.state_file)
+    assert os.path.isdir(overlay)
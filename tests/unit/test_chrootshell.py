@@ -0,0 +1,136 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import io
+
+import pytest
+
+# local imports
+from csmock.common.chrootshell import ChrootShell
+
+
+@pytest.fixture
+def shell_results(results, tmp_path):
+    """results with the attributes ChrootShell writes to"""
+    results.log_file = tmp_path / "scan.log"
+    results.log_fd = open(results.log_file, "w")
+    results.subproc = None
+    results.rvs = []
+    results.handle_rv = results.rvs.append
+    yield results
+    results.log_fd.close()
+
+
+@pytest.fixture
+def shell(shell_results):
+    # a plain shell stands in for `mock --shell`
+    shell = ChrootShell(shell_results, ["/bin/sh"])
+    assert shell.open()
+    yield shell
+    shell.close()
+
+
+def test_send_cmd(shell):
+    out = io.StringIO()
+    assert shell.send_cmd("echo foo; echo bar >&2", out) == 0
+    assert out.getvalue() == "foo\n"
+
+    # the exit code of each command is reported back
+    assert shell.send_cmd("exit 7", out) == 7
+
+    # stdin of the commands is not connected to the session
+    out = io.StringIO()
+    assert shell.send_cmd("cat; echo done", out) == 0
+    assert out.getvalue() == "done\n"
+
+    # output looking like the marker does not confuse the session
+    out = io.StringIO()
+    assert shell.send_cmd("echo csmock-shell-:1", out) == 0
+    assert out.getvalue() == "csmock-shell-:1\n"
+
+
+def test_exec_cmd(shell, shell_results):
+    assert shell.exec_cmd("echo foo", ["mock", "--shell", "echo foo"]) == 0
+    [msg] = shell_results.messages
+    assert "echo foo" in msg
+    shell_results.log_fd.flush()
+    assert shell_results.log_file.read_text() == "foo\n\n"
+    assert shell_results.rvs == [0]
+    assert shell_results.subproc is None
+
+
+def test_session_died(shell, shell_results):
+    out = io.StringIO()
+    assert shell.send_cmd("kill -9 $PPID", out) is None
+
+    shell = ChrootShell(shell_results, ["/bin/sh"])
+    assert shell.open()
+    assert shell.exec_cmd("kill -9 $PPID", ["mock", "--shell"]) != 0
+    assert shell.proc is None
+
+
+def test_open_failure(shell_results):
+    shell = ChrootShell(shell_results, ["/bin/false"])
+    assert not shell.open()
+    assert shell.proc is None
+    assert shell_results.errors == ["failed to open a persistent shell in the buildroot"]
+
+
+@pytest.fixture
+def mock(csmock_main, shell_results):
+    """MockWrapper using a plain shell as its persistent shell"""
+    mock = object.__new__(csmock_main.MockWrapper)
+    mock.results = shell_results
+    mock.use_shell = True
+    mock.shell = None
+    mock.root_pool = None
+    mock.root_generation = 0
+    mock.pkg_index = None
+    mock.build_mock_cmd = lambda args, quiet=True: ["/bin/sh"] if args == ["--shell"] else ["mock"] + args
+    mock.mock_cmds = []
+
+    def exec_cmd(cmd, shell=False):
+        mock.mock_cmds.append(cmd)
+        return 0
+
+    shell_results.exec_cmd = exec_cmd
+    yield mock
+    mock.close_shell()
+
+
+def test_exec_in_shell(mock):
+    assert mock.exec_mock_cmd(["--chroot", "true"]) == 0
+    assert mock.exec_mock_cmd(["--shell", "exit 3"]) == 3
+    shell = mock.shell
+    assert shell is not None
+    assert not mock.mock_cmds
+
+    # other commands are executed by mock, which needs the session closed
+    assert mock.exec_mock_cmd(["--install", "gcc"]) == 0
+    assert mock.mock_cmds == [["mock", "--install", "gcc"]]
+    assert mock.shell is None
+    assert shell.proc is None
+
+
+def test_shell_unavailable(mock):
+    mock.build_mock_cmd = lambda args, quiet=True: ["/bin/false"] if args == ["--shell"] else ["mock"] + args
+    assert mock.exec_mock_cmd(["--chroot", "true"]) == 0
+    assert mock.mock_cmds == [["mock", "--chroot", "true"]]
+
+    # the persistent shell is not tried again
+    assert not mock.use_shell
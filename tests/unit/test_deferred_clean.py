@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import fcntl
+import os
+
+import pytest
+
+# local imports
+from csmock.common.lock import RootLock
+from csmock.common.lock import root_is_dirty
+
+
+def lock_is_held(lock_file):
+    fd = os.open(lock_file, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+
+def test_release_deferred(results, tmp_path):
+    lock = RootLock(str(tmp_path / "root"))
+    lock.acquire(results)
+
+    # the reaper holds the lock till its commands finish, even if one of them fails
+    release = tmp_path / "release"
+    cleaned = tmp_path / "cleaned"
+    lock.release_deferred(results, [["sh", "-c", f"while ! test -e {release}; do sleep 0.01; done"],
+                                    ["false"],
+                                    ["touch", str(cleaned)]])
+    assert root_is_dirty(lock.name)
+    assert lock_is_held(lock.lock_file)
+    assert lock.lock_fd is None
+    assert lock.node_fd is None
+    assert not os.path.exists(lock.node_file)
+
+    # the next owner of the buildroot waits for the reaper
+    release.touch()
+    assert lock.acquire(results) < 10
+    assert cleaned.exists()
+    assert not root_is_dirty(lock.name)
+    assert not any("stale" in msg for msg in results.messages)
+    lock.release()
+
+    with open(lock.reaper_log) as f:
+        assert "reaper: command failed with exit code 1" in f.read()
+
+
+def test_release_deferred_not_acquired(results, tmp_path):
+    lock = RootLock(str(tmp_path / "root"))
+    lock.release_deferred(results, [["touch", str(tmp_path / "cleaned")]])
+    assert not root_is_dirty(lock.name)
+    assert not (tmp_path / "cleaned").exists()
+
+
+def test_stale_dirty_file(results, tmp_path):
+    lock = RootLock(str(tmp_path / "root"))
+
+    # left behind by a reaper that was killed
+    open(lock.dirty_file, "w").close()
+    assert root_is_dirty(lock.name)
+
+    lock.acquire(results)
+    assert not root_is_dirty(lock.name)
+    assert f"warning: removing stale {lock.dirty_file}" in results.messages
+    lock.release()
+
+
+@pytest.mark.parametrize("dirty, expected", [(set(), 0), ({0}, 1), ({0, 1}, 0)])
+def test_batch_prefers_clean_roots(csmock_main, monkeypatch, tmp_path, dirty, expected):
+    roots = []
+
+    def do_scan(props, output):
+        return 0
+
+    def root_is_dirty(name):
+        return any(name == csmock_main.root_lock_name(f"fedora-44-x86_64-batch{slot}") for slot in dirty)
+
+    def start(self, key, scan_fn, *args):
+        # record the buildroot of the first scan and stop the batch
+        roots.append(args[2])
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+    monkeypatch.setattr(csmock_main, "root_is_dirty", root_is_dirty)
+    monkeypatch.setattr(csmock_main.ForkedScans, "start", start)
+    props = csmock_main.ScanProps()
+    props.mock_profile = "fedora-44-x86_64"
+    props.deferred_clean = True
+    jobs = [("/srpms/foo-1.0-1.src.rpm", str(tmp_path / "foo-1.0-1.tar.xz"))]
+    assert csmock_main.do_batch_scan(props, jobs, str(tmp_path), 1, 0, diff_patches=False) == 130
+
+    # a spare buildroot is used while the other one is being cleaned up
+    assert roots == [f"fedora-44-x86_64-batch{expected}"]
@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import pytest
+
+# local imports
+from csmock.common.depcache import DYNAMIC_BUILD_REQUIRES
+from csmock.common.depcache import DepsCache
+
+REPOMD_OUT = "1111  /var/cache/dnf/fedora/repodata/repomd.xml\n2222  /var/cache/dnf/updates/repodata/repomd.xml\n"
+
+
+class FakeMock:
+    mock_profile = "fedora-44-x86_64"
+
+    def get_mock_cmd(self, args):
+        return ["mock"] + args
+
+
+@pytest.fixture
+def requires(monkeypatch):
+    """requires of the SRPM returned by srpm_requires()"""
+    requires = ["gcc", "make"]
+    monkeypatch.setattr("csmock.common.depcache.srpm_requires", lambda results, srpm: requires)
+    return requires
+
+
+@pytest.fixture
+def deps_cache(results, tmp_path):
+    results.repomd_out = (0, REPOMD_OUT)
+    results.get_cmd_output = lambda cmd, shell=True: results.repomd_out
+    return DepsCache(results, str(tmp_path / "deps"))
+
+
+def test_key_for(deps_cache, results, requires):
+    mock = FakeMock()
+    key = deps_cache.key_for(mock, "foo.src.rpm", ["a", "b"])
+    assert key is not None
+    assert deps_cache.key_for(mock, "foo.src.rpm", ["b", "a", "a"]) == key
+    assert deps_cache.key_for(mock, "foo.src.rpm", ["a"]) != key
+
+    # the order of repomd.xml checksums does not matter but their values do
+    results.repomd_out = (0, "\n".join(reversed(REPOMD_OUT.splitlines())))
+    assert deps_cache.key_for(mock, "foo.src.rpm", ["a", "b"]) == key
+    results.repomd_out = (0, REPOMD_OUT.replace("2222", "3333"))
+    assert deps_cache.key_for(mock, "foo.src.rpm", ["a", "b"]) != key
+
+    # different profile
+    results.repomd_out = (0, REPOMD_OUT)
+    mock.mock_profile = "fedora-43-x86_64"
+    assert deps_cache.key_for(mock, "foo.src.rpm", ["a", "b"]) != key
+
+    # different requires
+    mock.mock_profile = FakeMock.mock_profile
+    requires.append("bison")
+    assert deps_cache.key_for(mock, "foo.src.rpm", ["a", "b"]) != key
+
+
+def test_key_for_dynamic_build_requires(deps_cache, requires, tmp_path):
+    requires.append(DYNAMIC_BUILD_REQUIRES)
+    srpm = tmp_path / "foo.src.rpm"
+    srpm.write_bytes(b"v1")
+    key = deps_cache.key_for(FakeMock(), str(srpm), [])
+
+    # the contents of the SRPM are part of the key
+    srpm.write_bytes(b"v2")
+    assert deps_cache.key_for(FakeMock(), str(srpm), []) != key
+
+
+def test_key_for_unknown(deps_cache, results, monkeypatch):
+    # no repository metadata in the buildroot
+    monkeypatch.setattr("csmock.common.depcache.srpm_requires", lambda results, srpm: [])
+    results.repomd_out = (0, "")
+    assert deps_cache.key_for(FakeMock(), "foo.src.rpm", []) is None
+    results.repomd_out = (1, REPOMD_OUT)
+    assert deps_cache.key_for(FakeMock(), "foo.src.rpm", []) is None
+
+    # requires of the SRPM cannot be read
+    results.repomd_out = (0, REPOMD_OUT)
+    monkeypatch.setattr("csmock.common.depcache.srpm_requires", lambda results, srpm: None)
+    assert deps_cache.key_for(FakeMock(), "foo.src.rpm", []) is None
+
+
+def test_lookup_and_store(deps_cache, results):
+    assert deps_cache.lookup(None) is None
+    assert deps_cache.lookup("k") is None
+    assert results.ini_writer.entries["deps-cache"] == "miss"
+
+    deps_cache.store("k", ["make", "gcc"])
+    assert deps_cache.lookup("k") == ["gcc", "make"]
+
+    # only the first lookup of a scan is recorded
+    assert results.ini_writer.entries["deps-cache"] == "miss"
+
+    deps_cache.drop("k")
+    deps_cache.drop("k")
+    assert deps_cache.lookup("k") is None
+    assert not results.errors
@@ -0,0 +1,69 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import pytest
+
+
+@pytest.fixture
+def srpm(tmp_path):
+    srpm = tmp_path / "foo-1.0-1.fc44.src.rpm"
+    srpm.write_bytes(b"")
+    return str(srpm)
+
+
+@pytest.mark.parametrize("tool", ["gitleaks", "unicontrol"])
+def test_detected(run_main, srpm, tool):
+    (props, _) = run_main(["-t", tool, srpm])
+    assert props.can_skip_build()
+
+
+def test_disabled(run_main, srpm):
+    (props, _) = run_main(["-t", "gitleaks", "--no-source-only-fast-path", srpm])
+    assert not props.can_skip_build()
+
+
+@pytest.fixture
+def props(csmock_main):
+    props = csmock_main.ScanProps()
+    props.any_tool = True
+    props.add_source_scan("scan-sources", reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=["/tmp/out"])
+    return props
+
+
+def test_source_scans_only(props):
+    assert props.can_skip_build()
+
+
+def test_scan_of_build_results(props):
+    props.add_source_scan("scan-buildroot", reads=["/builddir/build/BUILDROOT"], writes=["/tmp/out2"])
+    assert not props.can_skip_build()
+
+
+def test_post_install_hook(props):
+    props.post_install_hooks += [lambda results, mock, props: 0]
+    assert not props.can_skip_build()
+
+
+@pytest.mark.parametrize("attr", ["need_rpm_bi", "run_check", "cswrap_enabled"])
+def test_build_observed(props, attr):
+    setattr(props, attr, True)
+    assert not props.can_skip_build()
+
+
+def test_no_tool(props):
+    props.any_tool = False
+    assert not props.can_skip_build()
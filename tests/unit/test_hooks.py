@@ -0,0 +1,129 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import threading
+import time
+
+import pytest
+
+# local imports
+from csmock.common.hooks import EXCLUSIVE_HOOK
+from csmock.common.hooks import HookDecl
+from csmock.common.hooks import HookTask
+from csmock.common.hooks import build_hook_dag
+from csmock.common.hooks import decls_conflict
+from csmock.common.hooks import paths_overlap
+from csmock.common.hooks import run_hook_dag
+from csmock.common.results import FatalError
+
+
+@pytest.mark.parametrize("a, b, overlap", [
+    ("/builddir", "/builddir", True),
+    ("/builddir/", "/builddir", True),
+    ("/builddir/build/BUILD", "/builddir", True),
+    ("/builddir", "/builddir/build/BUILD", True),
+    ("/builddir/build", "/builddir/build-results", False),
+    ("/tmp", "/builddir", False),
+])
+def test_paths_overlap(a, b, overlap):
+    assert paths_overlap(a, b) == overlap
+
+
+def test_decls_conflict():
+    reader = HookDecl(reads=["/builddir/build/BUILD"], concurrent=True)
+    other_reader = HookDecl(reads=["/builddir"], concurrent=True)
+    writer = HookDecl(reads=["/builddir/build/BUILD"], writes=["/builddir/results/a"], concurrent=True)
+    other_writer = HookDecl(writes=["/builddir/results/b"], concurrent=True)
+
+    assert not decls_conflict(reader, other_reader)
+    assert not decls_conflict(writer, other_writer)
+    assert not decls_conflict(reader, writer)
+    assert decls_conflict(writer, HookDecl(reads=["/builddir/results"], concurrent=True))
+    assert decls_conflict(HookDecl(writes=["/builddir/results"], concurrent=True), other_writer)
+
+    # undeclared or non-concurrent hooks conflict with everything
+    assert decls_conflict(reader, EXCLUSIVE_HOOK)
+    assert decls_conflict(EXCLUSIVE_HOOK, reader)
+    assert decls_conflict(reader, HookDecl(reads=["/tmp"]))
+
+
+def task(name, decl, key=None):
+    return HookTask(name, lambda: None, decl, key=key)
+
+
+def test_build_hook_dag_ordering():
+    tasks = build_hook_dag([
+        task("a", HookDecl(writes=["/out/a"], concurrent=True)),
+        task("b", HookDecl(writes=["/out/b"], concurrent=True)),
+        task("c", HookDecl(reads=["/out"], concurrent=True)),
+        task("d", EXCLUSIVE_HOOK),
+        task("e", HookDecl(concurrent=True, after=["late"])),
+        task("f", HookDecl(concurrent=True), key="late"),
+    ])
+    assert [t.preds for t in tasks] == [set(), set(), {0, 1}, {0, 1, 2}, {3, 5}, {3}]
+
+
+def test_run_hook_dag_ordering(results):
+    log = []
+    lock = threading.Lock()
+
+    def hook(name, delay=0):
+        def run():
+            with lock:
+                log.append(f"start {name}")
+            time.sleep(delay)
+            with lock:
+                log.append(f"end {name}")
+        return run
+
+    tasks = [
+        HookTask("slow", hook("slow", 0.2), HookDecl(writes=["/out/slow"], concurrent=True)),
+        HookTask("fast", hook("fast"), HookDecl(writes=["/out/fast"], concurrent=True)),
+        HookTask("merge", hook("merge"), HookDecl(reads=["/out"], concurrent=True)),
+    ]
+    run_hook_dag(results, tasks, max_workers=2)
+
+    # the independent hooks run in parallel, the dependent one waits for both
+    assert log.index("end fast") < log.index("end slow")
+    assert log[-2:] == ["start merge", "end merge"]
+
+
+def test_run_hook_dag_cycle(results):
+    tasks = [
+        task("a", HookDecl(concurrent=True, after=["b"]), key="a"),
+        task("b", HookDecl(concurrent=True, after=["a"]), key="b"),
+    ]
+    with pytest.raises(FatalError):
+        run_hook_dag(results, tasks, max_workers=2)
+    assert any("cyclic dependencies between hooks: a, b" in msg for msg in results.errors)
+
+
+def test_run_hook_dag_error(results):
+    started = []
+
+    def fail():
+        raise FatalError(1)
+
+    tasks = [
+        HookTask("fail", fail, EXCLUSIVE_HOOK),
+        HookTask("next", lambda: started.append("next"), EXCLUSIVE_HOOK),
+    ]
+    with pytest.raises(FatalError):
+        run_hook_dag(results, tasks, max_workers=2)
+
+    # no more hooks are started once a hook has failed
+    assert started == []
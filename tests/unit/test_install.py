@@ -0,0 +1,73 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import math
+import random
+
+import pytest
+
+
+@pytest.fixture
+def mock(csmock_main, results):
+    """MockWrapper whose transactions fail if they include a broken package"""
+    # constructing MockWrapper needs mock and its profile
+    mock = object.__new__(csmock_main.MockWrapper)
+    mock.results = results
+    mock.broken = set()
+    mock.transactions = []
+
+    def try_install(pkgs, quiet=True, prefetch=True):
+        mock.transactions.append(list(pkgs))
+        return not (set(pkgs) & mock.broken)
+
+    mock.try_install = try_install
+    mock.installed_provides = lambda: {"tar"}
+    return mock
+
+
+def max_transactions(n):
+    return n + 2 * math.log2(n) + 1
+
+
+def test_all_installed(mock):
+    assert mock.try_install_each(["tar", "", "make >= 4"]) == []
+    assert mock.transactions == [["make >= 4"]]
+
+
+def test_one_broken(mock):
+    pkgs = [f"pkg{i}" for i in range(64)]
+    mock.broken = {"pkg37"}
+    assert mock.try_install_each(pkgs) == ["pkg37"]
+    assert len(mock.transactions) <= 2 * math.log2(64) + 1
+
+
+def test_all_broken(mock):
+    pkgs = [f"pkg{i}" for i in range(64)]
+    mock.broken = set(pkgs)
+    assert mock.try_install_each(pkgs) == pkgs
+
+    # the whole set, its halves, and then each package
+    assert len(mock.transactions) == 1 + 2 + 64
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_never_much_worse_than_linear(mock, seed):
+    rng = random.Random(seed)
+    pkgs = [f"pkg{i}" for i in range(rng.randint(1, 200))]
+    mock.broken = set(rng.sample(pkgs, rng.randint(0, len(pkgs))))
+    assert mock.try_install_each(pkgs) == [pkg for pkg in pkgs if pkg in mock.broken]
+    assert len(mock.transactions) <= max_transactions(len(pkgs))
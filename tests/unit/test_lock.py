@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import multiprocessing
+import os
+import time
+
+# local imports
+from csmock.common.lock import RootLock
+
+
+def test_acquire_release(results, tmp_path):
+    lock = RootLock(str(tmp_path / "root"))
+    assert lock.acquire(results) < 1
+    with open(lock.lock_file) as f:
+        assert f.read() == f"{os.getpid()}\n"
+    assert os.path.exists(lock.node_file)
+
+    lock.release()
+    assert not os.path.exists(lock.lock_file)
+    assert not os.path.exists(lock.node_file)
+    with open(lock.queue_file) as f:
+        assert f.read() == ""
+
+
+def test_stale_queue_entry(results, tmp_path):
+    lock = RootLock(str(tmp_path / "root"))
+
+    # PID 1 surely exists but it does not hold the node file (e.g. a reused PID)
+    with open(lock.queue_file, "w") as f:
+        f.write("1\n")
+    open(lock.node_file_by_pid(1), "w").close()
+
+    assert lock.acquire(results) < 1
+    assert not os.path.exists(lock.node_file_by_pid(1))
+    assert not any("waiting" in msg for msg in results.messages)
+    lock.release()
+
+
+def test_stray_legacy_lock_file(results, tmp_path):
+    lock = RootLock(str(tmp_path / "root"))
+
+    # lock file left behind by an old csmock that was killed
+    proc = multiprocessing.get_context("fork").Process(target=lambda: None)
+    proc.start()
+    proc.join()
+    with open(lock.lock_file, "w") as f:
+        f.write(f"{proc.pid}\n")
+
+    lock.acquire(results)
+    assert any("purging stray lock file" in msg for msg in results.messages)
+    lock.release()
+
+
+def hold_lock(name, acquired, hold_time):
+    class Results:
+        def print_with_ts(self, msg):
+            pass
+
+        def handle_ec(self):
+            pass
+
+    lock = RootLock(name)
+    lock.acquire(Results())
+    acquired.set()
+    time.sleep(hold_time)
+    lock.release()
+
+
+def test_waits_for_owner(results, tmp_path):
+    name = str(tmp_path / "root")
+    ctx = multiprocessing.get_context("fork")
+    acquired = ctx.Event()
+    owner = ctx.Process(target=hold_lock, args=(name, acquired, 0.5))
+    owner.start()
+    try:
+        assert acquired.wait(10)
+        lock = RootLock(name)
+        assert lock.acquire(results) >= 0.3
+        assert any(f"waiting till PID {owner.pid} releases" in msg for msg in results.messages)
+        lock.release()
+    finally:
+        owner.join()
+
+
+def test_owner_killed(results, tmp_path):
+    name = str(tmp_path / "root")
+    ctx = multiprocessing.get_context("fork")
+    acquired = ctx.Event()
+    owner = ctx.Process(target=hold_lock, args=(name, acquired, 60))
+    owner.start()
+    assert acquired.wait(10)
+    owner.kill()
+    owner.join()
+
+    # the lock of a killed owner is taken over without waiting for anything
+    lock = RootLock(name)
+    assert lock.acquire(results) < 1
+    lock.release()
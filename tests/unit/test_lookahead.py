@@ -0,0 +1,98 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import glob
+import os
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def make_mock(csmock_main, results, monkeypatch):
+    """return a function creating MockWrapper sharing the given build slots"""
+    monkeypatch.setattr(csmock_main, "BUILD_SLOT_WAITING_TICK", 0.01)
+
+    def make_mock(build_slots):
+        mock = object.__new__(csmock_main.MockWrapper)
+        mock.results = results
+        mock.build_slots = build_slots
+        mock.build_slot_taken = False
+        return mock
+
+    return make_mock
+
+
+def test_wait_for_build_slot(make_mock, results):
+    build_slots = threading.Semaphore(1)
+    mock0 = make_mock(build_slots)
+    mock0.wait_for_build_slot()
+    assert mock0.build_slot_taken
+    assert results.ini_writer.entries["build-slot-wait-time"] == 0
+
+    # the slot is taken only once per scan
+    mock0.wait_for_build_slot()
+
+    # another scan waits till the slot is released
+    mock1 = make_mock(build_slots)
+    waiter = threading.Thread(target=mock1.wait_for_build_slot)
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive()
+    build_slots.release()
+    waiter.join(10)
+    assert mock1.build_slot_taken
+
+
+def test_no_build_slots(make_mock, results):
+    mock = make_mock(None)
+    mock.wait_for_build_slot()
+    assert not mock.build_slot_taken
+    assert "build-slot-wait-time" not in results.ini_writer.entries
+
+
+def wait_for_all(pattern, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while len(glob.glob(pattern)) < count:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_batch_lookahead(csmock_main, monkeypatch, tmp_path):
+    def do_scan(props, output):
+        # the buildroots of all scans are prepared at the same time
+        open(f"{output}.prepared", "w").close()
+        if not wait_for_all(str(tmp_path / "*.prepared"), 3):
+            return 7
+
+        # but only one of them builds at a time
+        with props.build_slots:
+            open(f"{output}.building", "w").close()
+            overlap = len(glob.glob(str(tmp_path / "*.building"))) > 1
+            time.sleep(0.05)
+            os.unlink(f"{output}.building")
+        return 8 if overlap else 0
+
+    monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+    props = csmock_main.ScanProps()
+    props.mock_profile = "fedora-44-x86_64"
+    jobs = [(f"/srpms/{name}.src.rpm", str(tmp_path / name)) for name in ["foo-1-1", "bar-1-1", "baz-1-1"]]
+    assert csmock_main.do_batch_scan(props, jobs, str(tmp_path), 1, 2, diff_patches=False) == 0
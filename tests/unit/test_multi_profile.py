@@ -0,0 +1,129 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import os
+import sys
+
+import pytest
+
+
+def test_host_prep(csmock_main, results, tmp_path):
+    prep_dir = tmp_path / "prep"
+    prep_dir.mkdir()
+    (prep_dir / "snyk-results.json").write_text("{}")
+    host_prep = csmock_main.HostPrep(str(prep_dir), None, [("snyk-version", "1.0")], ["snyk-results.json"])
+
+    scan_tmpdir = tmp_path / "scan"
+    scan_tmpdir.mkdir()
+    results.tmpdir = str(scan_tmpdir)
+    host_prep.apply(results)
+    assert results.ini_writer.entries == {"snyk-version": "1.0"}
+    assert (scan_tmpdir / "snyk-results.json").read_text() == "{}"
+
+
+@pytest.fixture
+def run_multi(csmock_main, monkeypatch, tmp_path, capsys):
+    """return a function running main() of csmock with the given profiles, which returns (exit code, props)"""
+    def run_multi(profiles, argv):
+        scans = []
+
+        def do_multi_profile_scan(props, output):
+            scans.append(props)
+            return 0
+
+        paths = []
+        for name in profiles:
+            profile = tmp_path / f"{name}.cfg"
+            profile.write_text("")
+            paths.append(str(profile))
+
+        srpm = tmp_path / "foo-1.0-1.src.rpm"
+        srpm.write_bytes(b"")
+        monkeypatch.setattr(csmock_main, "do_multi_profile_scan", do_multi_profile_scan)
+        monkeypatch.setattr(sys, "argv", ["csmock", "-r", ",".join(paths)] + argv + [str(srpm)])
+        with pytest.raises(SystemExit) as exc:
+            csmock_main.main()
+        return (exc.value.code, scans[0] if scans else None, capsys.readouterr().err)
+
+    return run_multi
+
+
+def test_multi_profile_option(run_multi, tmp_path):
+    (ec, props, _) = run_multi(["fedora-44-x86_64", "centos-stream-10-x86_64"], [])
+    assert ec == 0
+    assert props.mock_profiles == [str(tmp_path / "fedora-44-x86_64.cfg"),
+                                   str(tmp_path / "centos-stream-10-x86_64.cfg")]
+    assert props.mock_profile == props.mock_profiles[0]
+
+
+@pytest.mark.parametrize("opts", [["--checkpoint"], ["--no-scan"], ["--base-srpm", "/foo.src.rpm"]])
+def test_multi_profile_option_conflicts(run_multi, opts):
+    (ec, props, err) = run_multi(["fedora-44-x86_64", "centos-stream-10-x86_64"], opts)
+    assert ec == 2
+    assert props is None
+    assert "multiple mock profiles" in err
+
+
+def test_multi_profile_same_name(run_multi, tmp_path):
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "fedora-44-x86_64.cfg").write_text("")
+    (ec, props, err) = run_multi(["fedora-44-x86_64", "other/fedora-44-x86_64"], [])
+    assert ec == 2
+    assert "distinct names" in err
+
+
+def test_do_multi_profile_scan(csmock_main, monkeypatch, tmp_path):
+    def pre_mock_hook(results, props):
+        # the hooks run only once for all the profiles
+        with open(os.path.join(results.tmpdir, "pre-mock.txt"), "a") as f:
+            f.write("x")
+        results.ini_writer.append("pre-mock", "done")
+        return 0
+
+    def do_scan(props, output):
+        # record what the scan in the given profile got from the host-side preparation
+        os.makedirs(output)
+        with open(os.path.join(output, "scan.txt"), "w") as f:
+            f.write(f"{props.mock_profile} {props.host_prep.tmp_files} {props.host_prep.ini_entries}")
+        return 1 if "centos" in props.mock_profile else 0
+
+    monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+    props = csmock_main.ScanProps()
+    props.plugins = csmock_main.PluginManager()
+    props.pre_mock_hooks = [pre_mock_hook]
+    props.mock_profiles = ["fedora-44-x86_64", "centos-stream-10-x86_64"]
+    props.nvr = "foo-1.0-1"
+    props.shell_cmd_to_build = "make"
+    props.keep_going = True
+    props.known_false_positives = None
+    props.kfp_git_url = None
+
+    output = tmp_path / "foo-1.0-1"
+    csmock_main.do_multi_profile_scan(props, str(output))
+    assert (output / "fedora-44-x86_64" / "scan.txt").read_text() \
+        == "fedora-44-x86_64 ['pre-mock.txt'] [('pre-mock', 'done')]"
+    assert (output / "centos-stream-10-x86_64" / "scan.txt").read_text().startswith("centos-stream-10-x86_64 ")
+
+    # the summary lists the profiles in the order they were given
+    lines = (output / "profiles-summary.txt").read_text().splitlines()
+    assert [line.split("\t")[2] for line in lines[1:]] == props.mock_profiles
+    assert [line.split("\t")[0] for line in lines[1:]] == ["0", "1"]
+
+    scan_ini = (output / "scan.ini").read_text()
+    assert "exit-code-fedora-44-x86_64 = 0\n" in scan_ini
+    assert "exit-code-centos-stream-10-x86_64 = 1\n" in scan_ini
@@ -0,0 +1,80 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import os
+import sys
+import time
+
+import pytest
+
+
+def wait_for(path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_do_parallel_runs(csmock_main, monkeypatch, results, tmp_path):
+    def do_scan(props, output):
+        # each scan waits for the other one, which succeeds only if they run in parallel
+        os.makedirs(output)
+        with open(os.path.join(output, "root"), "w") as f:
+            f.write(props.mock_root_override)
+        other = "run1" if output.endswith("run0") else "run0"
+        if not wait_for(os.path.join(os.path.dirname(output), other, "root")):
+            return 7
+        return 1 if output.endswith("run1") else 0
+
+    monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+    props = csmock_main.ScanProps()
+    props.mock_profile = "fedora-44-x86_64"
+    run0 = str(tmp_path / "run0")
+    run1 = str(tmp_path / "run1")
+    assert csmock_main.do_parallel_runs(results, props, run0, props, run1) == (0, 1)
+
+    # each scan runs in a buildroot of its own
+    assert (tmp_path / "run0" / "root").read_text() == "fedora-44-x86_64-run0"
+    assert (tmp_path / "run1" / "root").read_text() == "fedora-44-x86_64-run1"
+    assert props.mock_root_override is None
+
+
+def test_auto_root_override(csmock_main):
+    props = csmock_main.ScanProps()
+    props.mock_profile = "/etc/mock/fedora-44-x86_64.cfg"
+    assert csmock_main.auto_root_override(props, "run0") == "fedora-44-x86_64-run0"
+    props.mock_root_override = "my-root"
+    assert csmock_main.auto_root_override(props, "run1") == "my-root-run1"
+
+
+@pytest.mark.parametrize("opts, msg", [
+    ([], "--parallel-diff makes no sense without --base-srpm or --diff-patches"),
+    (["--diff-patches", "--skip-init"], "options --parallel-diff and --skip-init are mutually exclusive"),
+])
+def test_parallel_diff_option_conflicts(csmock_main, monkeypatch, tmp_path, capsys, opts, msg):
+    profile = tmp_path / "fedora-44-x86_64.cfg"
+    profile.write_text("")
+    srpm = tmp_path / "foo-1.0-1.src.rpm"
+    srpm.write_bytes(b"")
+    monkeypatch.setattr(sys, "argv", ["csmock", "-r", str(profile), "--parallel-diff"] + opts + [str(srpm)])
+    with pytest.raises(SystemExit) as exc:
+        csmock_main.main()
+    assert exc.value.code == 2
+    assert msg in capsys.readouterr().err
@@ -0,0 +1,134 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import ast
+import json
+import os
+import pprint
+import time
+
+import pytest
+
+# local imports
+from csmock.common.payloads import PAYLOAD_MAX_AGE
+from csmock.common.payloads import PAYLOAD_MIN_SIZE
+from csmock.common.payloads import PAYLOAD_MOUNT_POINT
+from csmock.common.payloads import PayloadStore
+
+
+@pytest.fixture
+def files(tmp_path):
+    src = tmp_path / "src"
+    (src / "scripts").mkdir(parents=True)
+    (src / "small").write_bytes(b"x")
+    (src / "large").write_bytes(b"y" * PAYLOAD_MIN_SIZE)
+    (src / "large").chmod(0o755)
+    (src / "skipped").write_bytes(b"z" * PAYLOAD_MIN_SIZE)
+    return [str(src / name) for name in ["small", "large", "scripts", "skipped"]]
+
+
+@pytest.fixture
+def store(results, tmp_path):
+    return PayloadStore(results, str(tmp_path / "store"))
+
+
+def test_split(store, files, tmp_path):
+    links_dir = tmp_path / "links"
+    (copy_files, links) = store.split(files, str(links_dir), files[3])
+
+    # only large regular files go through the store
+    assert copy_files == [files[0], files[2], files[3]]
+    assert links == [files[1].lstrip("/")]
+
+    target = os.readlink(links_dir / links[0])
+    assert os.path.dirname(target) == PAYLOAD_MOUNT_POINT
+    name = os.path.basename(target)
+    assert name.endswith("-0755")
+    stored = os.path.join(store.store_dir, name)
+    assert open(stored, "rb").read() == open(files[1], "rb").read()
+    assert os.stat(stored).st_mode & 0o777 == 0o755
+
+    with open(store.index_file) as f:
+        assert json.load(f)[files[1]]["name"] == name
+
+
+def test_split_reuses_payload(store, files, tmp_path, results):
+    store.split(files, str(tmp_path / "links1"), files[3])
+    results.messages.clear()
+    (_, links) = store.split(files, str(tmp_path / "links2"), files[3])
+    assert len(links) == 1
+    assert not any("adding payload" in msg for msg in results.messages)
+
+
+def test_prune(store, files, tmp_path):
+    store.split(files, str(tmp_path / "links1"), files[3])
+    [name] = [n for n in os.listdir(store.store_dir) if not n.startswith(".") and n != "index.json"]
+
+    # make the payload look unused for too long
+    old = time.time() - PAYLOAD_MAX_AGE - 1
+    os.utime(os.path.join(store.store_dir, name), (old, old))
+    os.utime(store.lock_file, (old, old))
+
+    with store.locked():
+        index = store.load_index()
+        store.prune(index)
+    assert index == {}
+    assert sorted(os.listdir(store.store_dir)) == [".lock", "index.json"]
+
+
+class Mock:
+    def __init__(self, mountinfo):
+        self.mountinfo = mountinfo
+
+    def get_mock_cmd(self, args):
+        return ["printf", "%s", self.mountinfo]
+
+
+@pytest.mark.parametrize("opts, read_only", [("ro,relatime", True), ("rw,relatime", False)])
+def test_check_read_only(store, results, opts, read_only):
+    mountinfo = f"1 0 0:1 / / rw shared:1 - ext4 /dev/sda rw\n"                 f"2 1 0:2 /store {PAYLOAD_MOUNT_POINT} {opts} shared:2 - ext4 /dev/sda rw\n"
+    assert store.check_read_only(Mock(mountinfo)) == read_only
+
+
+def test_check_read_only_not_mounted(store):
+    assert not store.check_read_only(Mock("1 0 0:1 / / ro shared:1 - ext4 /dev/sda rw\n"))
+
+
+def debug_config(plugin_conf):
+    # mock pretty-prints the values spanning multiple lines
+    return "config_opts['plugin_conf'] = %s\nconfig_opts['root'] = 'fedora-x86_64'\n" \
+        % pprint.pformat(plugin_conf, width=40)
+
+
+def test_get_mock_opts_appends_to_profile(store):
+    profile_dirs = [("/srv/a", "/mnt/a"), ("/srv/b", "/mnt/b")]
+    conf = {"bind_mount_enable": True, "bind_mount_opts": {"dirs": profile_dirs, "create_dirs": True}}
+    [enable, opt] = store.get_mock_opts(debug_config(conf))
+    assert enable == "--enable-plugin=bind_mount"
+    assert opt.startswith("--plugin-option=bind_mount:dirs=")
+    dirs = ast.literal_eval(opt.split("=", 2)[2])
+    assert dirs == profile_dirs + [(store.store_dir, PAYLOAD_MOUNT_POINT, "ro")]
+
+
+def test_get_mock_opts_no_profile_mounts(store):
+    [_, opt] = store.get_mock_opts(debug_config({"ccache_enable": False}))
+    assert opt.endswith(repr([(store.store_dir, PAYLOAD_MOUNT_POINT, "ro")]))
+
+
+@pytest.mark.parametrize("config", [None, "", "config_opts['plugin_conf'] = {'a': open('x')}\n"])
+def test_get_mock_opts_unknown_profile_mounts(store, config):
+    assert store.get_mock_opts(config) is None
@@ -0,0 +1,75 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import pytest
+
+RPM_QA_OUT = "@gcc-14.1-1.fc44.x86_64\ngcc\ngcc(x86-64)\n@make-4.4-1.fc44.x86_64\nmake\n/usr/bin/make\n"
+
+
+@pytest.fixture
+def mock(csmock_main, results):
+    """MockWrapper running fake commands instead of mock"""
+    # constructing MockWrapper needs mock and its profile
+    mock = object.__new__(csmock_main.MockWrapper)
+    mock.results = results
+    mock.use_shell = False
+    mock.root_pool = None
+    mock.root_generation = 0
+    mock.pkg_index = None
+    mock.queries = 0
+    mock.ec = 0
+
+    def get_mock_cmd(args, quiet=True):
+        if args[0] == "--shell" and args[1].startswith("rpm -qa"):
+            mock.queries += 1
+            return ["printf", "%s", RPM_QA_OUT]
+        return ["sh", "-c", f"exit {mock.ec}"]
+
+    mock.get_mock_cmd = get_mock_cmd
+    return mock
+
+
+def test_load_pkg_index(mock):
+    (pkgs, provides) = mock.load_pkg_index()
+    assert pkgs == {"gcc-14.1-1.fc44.x86_64", "make-4.4-1.fc44.x86_64"}
+    assert provides == {"gcc", "gcc(x86-64)", "make", "/usr/bin/make"}
+
+    # the index is queried only once
+    assert mock.installed_provides() is provides
+    assert mock.queries == 1
+
+
+def test_find_missing_pkgs(csmock_main, mock):
+    pkgs = ["gcc", "make >= 4.4", "/usr/bin/make", "clang", "llvm > 18"]
+    assert csmock_main.find_missing_pkgs(pkgs, mock) == ["clang", "llvm > 18"]
+
+
+@pytest.mark.parametrize("args, ec, kept", [
+    (["--copyout", "/builddir/a", "/tmp/a"], 0, True),
+    (["--snapshot", "deps"], 0, True),
+    (["--install", "foo"], 1, True),
+    (["--install", "foo"], 0, False),
+    (["--chroot", "rm -rf /usr"], 0, False),
+    (["--clean"], 0, False),
+    (["--copyin", "/tmp/a.rpm", "/a.rpm"], 0, False),
+])
+def test_index_invalidated(mock, args, ec, kept):
+    mock.load_pkg_index()
+    mock.ec = ec
+    assert mock.exec_mock_cmd(args) == ec
+    mock.load_pkg_index()
+    assert mock.queries == (1 if kept else 2)
@@ -0,0 +1,131 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import threading
+
+import pytest
+
+# local imports
+from csmock.common.results import FatalError
+
+
+@pytest.fixture
+def props(csmock_main):
+    props = csmock_main.ScanProps()
+    props.overlap_pre_mock = True
+    return props
+
+
+def test_background_hooks_staged(props, results, csmock_main):
+    started = threading.Event()
+    release = threading.Event()
+
+    def sync_hook(results, props):
+        props.copy_in_files += ["/tmp/sync"]
+        return 0
+
+    def fetch_hook(results, props):
+        started.set()
+        release.wait()
+        props.copy_in_files += ["/tmp/analyzer"]
+        props.copy_out_files += ["/builddir/out.sarif"]
+        props.add_source_scan("analyzer", reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=["/builddir/out.sarif"])
+        return 0
+
+    props.pre_mock_hooks += [sync_hook, fetch_hook]
+    props.declare_hook(fetch_hook, concurrent=True)
+
+    background = props.start_pre_mock(results)
+    assert started.wait(10)
+
+    # hooks declared concurrent run in the background without touching props
+    assert props.copy_in_files[-1] == "/tmp/sync"
+    props.copy_in_files += ["/tmp/build.sh"]
+    release.set()
+    background.join()
+
+    # their changes are merged once joined
+    assert props.copy_in_files[-3:] == ["/tmp/sync", "/tmp/build.sh", "/tmp/analyzer"]
+    assert props.copy_out_files == ["/builddir/out.sarif"]
+    assert props.post_build_chroot_cmds == ["analyzer"]
+    assert "analyzer" in props.source_scans
+    assert props.hook_decls["analyzer"].concurrent
+
+
+def test_failed_hook_not_merged(props, results):
+    def fetch_hook(results, props):
+        props.copy_in_files += ["/tmp/analyzer"]
+        return 1
+
+    props.pre_mock_hooks += [fetch_hook]
+    props.declare_hook(fetch_hook, concurrent=True)
+    copy_in_files = list(props.copy_in_files)
+
+    background = props.start_pre_mock(results)
+    with pytest.raises(FatalError):
+        background.join()
+    assert props.copy_in_files == copy_in_files
+
+
+def test_no_overlap(props, results):
+    def fetch_hook(results, props):
+        props.copy_in_files += ["/tmp/analyzer"]
+        return 0
+
+    props.overlap_pre_mock = False
+    props.pre_mock_hooks += [fetch_hook]
+    props.declare_hook(fetch_hook, concurrent=True)
+    assert props.start_pre_mock(results) is None
+    assert props.copy_in_files[-1] == "/tmp/analyzer"
+
+
+def test_merge_staged_removal(props, csmock_main):
+    props.copy_out_files += ["/a", "/b"]
+    snapshot = csmock_main.copy_scan_props(props)
+    staged = csmock_main.copy_scan_props(props)
+    staged.copy_out_files.remove("/a")
+    staged.no_scan = True
+    props.merge_staged(staged, snapshot)
+    assert props.copy_out_files == ["/b"]
+    assert props.no_scan
+
+
+class Boom(Exception):
+    pass
+
+
+def test_joined_if_buildroot_fails(props, results, csmock_main, monkeypatch):
+    done = []
+
+    def fetch_hook(results, props):
+        done.append(True)
+        return 0
+
+    props.pre_mock_hooks += [fetch_hook]
+    props.declare_hook(fetch_hook, concurrent=True)
+
+    class MockWrapper:
+        def __init__(self, results, props):
+            raise Boom()
+
+    monkeypatch.setattr(csmock_main, "MockWrapper", MockWrapper)
+    background = props.start_pre_mock(results)
+    with pytest.raises(Boom):
+        with csmock_main.enter_mock(results, props, background):
+            pass
+    assert done == [True]
+    assert background.thread is None
@@ -0,0 +1,147 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import functools
+import http.server
+import pathlib
+import pprint
+import threading
+
+import pytest
+
+# local imports
+from csmock.common.prefetch import Prefetcher
+from csmock.common.prefetch import repo_gpg_keys
+
+RPM_NAME = "foo-1.0-1.noarch.rpm"
+
+
+def debug_config(dnf_conf):
+    return f"config_opts['root'] = 'fedora-x86_64'\nconfig_opts['dnf.conf'] = {dnf_conf!r}\n"
+
+
+def test_repo_gpg_keys():
+    conf = "[main]\ngpgcheck=1\n\n[fedora]\ngpgkey=file:///keys/a file:///keys/b\n" \
+           "\n[local]\ngpgcheck=0\n\n[off]\nenabled=0\ngpgkey=https://example.com/key\n"
+    assert repo_gpg_keys(debug_config(conf)) == ["/keys/a", "/keys/b"]
+
+
+def test_repo_gpg_keys_pretty_printed():
+    # mock splits long values over multiple lines
+    conf = "[main]\ngpgcheck=1\n\n[fedora]\ngpgkey=file:///keys/a\n" + "# comment\n" * 10
+    config = "config_opts['dnf.conf'] = %s\nconfig_opts['root'] = 'fedora-x86_64'\n" % pprint.pformat(conf)
+    assert "\n " in config
+    assert repo_gpg_keys(config) == ["/keys/a"]
+
+
+def test_repo_gpg_keys_gpgcheck_disabled():
+    assert repo_gpg_keys(debug_config("[main]\n\n[fedora]\nbaseurl=http://example.com/\n")) == []
+
+
+@pytest.mark.parametrize("gpgkey", ["", "gpgkey=https://example.com/key\n",
+                                    "gpgkey=file:///keys/fedora-$releasever\n"])
+def test_repo_gpg_keys_not_local(gpgkey):
+    assert repo_gpg_keys(debug_config(f"[main]\n\n[fedora]\ngpgcheck=1\n{gpgkey}")) is None
+
+
+def test_repo_gpg_keys_no_config():
+    assert repo_gpg_keys("config_opts['root'] = 'fedora-x86_64'\n") is None
+
+
+@pytest.fixture
+def repos(tmp_path):
+    """two repositories served over HTTP providing different RPMs of the same name"""
+    root = tmp_path / "srv"
+    for repo in ["repo1", "repo2", "broken"]:
+        (root / repo).mkdir(parents=True)
+        data = b"NOT AN RPM" if repo == "broken" else f"RPM from {repo}".encode()
+        (root / repo / RPM_NAME).write_bytes(data)
+
+    requests = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            requests.append(self.path)
+
+    handler = functools.partial(Handler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield (f"http://127.0.0.1:{server.server_port}", root, requests)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def prefetcher(results, tmp_path, monkeypatch):
+    # there is no rpm on the build host of the tests, accept our fake RPMs instead
+    monkeypatch.setattr(Prefetcher, "verify", lambda self, path: open(path, "rb").read().startswith(b"RPM"))
+    return Prefetcher(results, str(tmp_path / "prefetch"), "/etc/mock/fedora-x86_64.cfg", 2)
+
+
+def test_fetch_keyed_by_repo(prefetcher, repos):
+    (url, _, requests) = repos
+    urls = [f"{url}/repo1/{RPM_NAME}", f"{url}/repo2/{RPM_NAME}"]
+    paths = prefetcher.fetch(urls)
+    assert len(paths) == 2
+    assert [open(path, "rb").read() for path in paths] == [b"RPM from repo1", b"RPM from repo2"]
+
+    # the second fetch is served from the local repository
+    requests.clear()
+    assert prefetcher.fetch(urls) == paths
+    assert requests == []
+
+
+def test_fetch_replaces_corrupted_cache(prefetcher, repos):
+    (url, _, requests) = repos
+    [path] = prefetcher.fetch([f"{url}/repo1/{RPM_NAME}"])
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+
+    requests.clear()
+    assert prefetcher.fetch([f"{url}/repo1/{RPM_NAME}"]) == [path]
+    assert open(path, "rb").read() == b"RPM from repo1"
+    assert len(requests) == 1
+
+
+def test_fetch_rejects_unverified(prefetcher, repos, results):
+    (url, _, _) = repos
+    assert prefetcher.fetch([f"{url}/broken/{RPM_NAME}"]) is None
+    assert any("verification failed" in msg for msg in results.errors)
+
+    # no temporary file is left behind
+    assert [path.name for path in pathlib.Path(prefetcher.repo_dir).rglob("*") if path.is_file()] == []
+
+
+def test_fetch_file_url(prefetcher, repos):
+    (_, root, _) = repos
+    [path] = prefetcher.fetch([f"file://{root}/repo2/{RPM_NAME}"])
+    assert open(path, "rb").read() == b"RPM from repo2"
+
+
+def test_unverifiable_profile_disables_prefetch(results, tmp_path):
+    class Mock:
+        def get_debug_config(self):
+            return debug_config("[main]\ngpgcheck=1\n\n[fedora]\ngpgkey=https://example.com/key\n")
+
+        def get_mock_cmd(self, args):
+            raise AssertionError("prefetching should have been disabled")
+
+    prefetcher = Prefetcher(results, str(tmp_path), "fedora-x86_64", 1)
+    assert prefetcher.resolve(Mock(), ["foo"]) is None
+    assert prefetcher.keyring is None
@@ -0,0 +1,54 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import sys
+
+import pytest
+
+
+def test_resume(run_main, tmp_path):
+    srpm = tmp_path / "foo-1.0-1.fc44.src.rpm"
+    srpm.write_bytes(b"")
+    output = tmp_path / "foo-1.0-1.fc44.tar.xz"
+
+    # the results of the interrupted scan are not written yet
+    (props, out) = run_main(["--resume", str(output), str(srpm)])
+    assert props.resume
+    assert props.checkpoint_dir is not None
+    assert out == str(output)
+
+    # an existing output file is not a problem when resuming
+    output.write_bytes(b"")
+    (props, out) = run_main(["--resume", str(output), str(srpm)])
+    assert props.resume
+
+
+def test_resume_with_different_output(csmock_main, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(sys, "argv", ["csmock", "--resume", str(tmp_path / "a.tar.xz"),
+                                      "-o", str(tmp_path / "b.tar.xz"), str(tmp_path / "foo.src.rpm")])
+    with pytest.raises(SystemExit) as exc:
+        csmock_main.main()
+    assert exc.value.code == 2
+    assert "--resume and --output need to specify the same path" in capsys.readouterr().err
+
+
+def test_no_resume(run_main, tmp_path):
+    srpm = tmp_path / "foo-1.0-1.fc44.src.rpm"
+    srpm.write_bytes(b"")
+    (props, _) = run_main(["-o", str(tmp_path / "out.tar.xz"), str(srpm)])
+    assert not props.resume
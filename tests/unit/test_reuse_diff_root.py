@@ -0,0 +1,93 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def diff_scan(csmock_main, monkeypatch, tmp_path):
+    """return a function running do_diff_scan() with --reuse-diff-root, which returns the props of both scans"""
+    def diff_scan(**kwargs):
+        scans = []
+
+        def do_scan(props, output):
+            scans.append(props)
+            return 0
+
+        monkeypatch.setattr(csmock_main, "do_scan", do_scan)
+        props = csmock_main.ScanProps()
+        props.nvr = "foo-2.0-1"
+        props.srpm = "/srpms/foo-2.0-1.src.rpm"
+        props.base_srpm = "/srpms/foo-1.0-1.src.rpm"
+        props.mock_profile = "fedora-44-x86_64"
+        props.base_mock_profile = "fedora-44-x86_64"
+        props.reuse_diff_root = True
+        for (name, value) in kwargs.items():
+            setattr(props, name, value)
+
+        # csdiff is not needed for the scans to run
+        csmock_main.do_diff_scan(props, str(tmp_path / "out"), diff_patches=False)
+        [run0_props, run1_props] = scans
+        assert props.root_pool_dir == kwargs.get("root_pool_dir")
+        return (run0_props, run1_props)
+
+    return diff_scan
+
+
+def test_reuse_diff_root(csmock_main, diff_scan):
+    (run0_props, run1_props) = diff_scan()
+    assert run0_props.srpm == "/srpms/foo-1.0-1.src.rpm"
+    assert run1_props.srpm == "/srpms/foo-2.0-1.src.rpm"
+
+    # the first scan creates a snapshot, which the second scan consumes
+    assert run0_props.root_pool_dir == run1_props.root_pool_dir == csmock_main.DIFF_ROOT_POOL_DIR
+    assert run0_props.root_pool_mode == csmock_main.POOL_MODE_CREATE
+    assert run1_props.root_pool_mode == csmock_main.POOL_MODE_CONSUME
+
+
+def test_reuse_diff_root_other_profile(diff_scan):
+    (run0_props, run1_props) = diff_scan(base_mock_profile="fedora-43-x86_64")
+    assert run0_props.mock_profile == "fedora-43-x86_64"
+    assert run0_props.root_pool_dir is None
+    assert run1_props.root_pool_dir is None
+
+
+def test_reuse_diff_root_with_root_pool(diff_scan):
+    # the shared root pool is used instead
+    (run0_props, run1_props) = diff_scan(root_pool_dir="/var/tmp/pool")
+    assert run0_props.root_pool_dir == run1_props.root_pool_dir == "/var/tmp/pool"
+    assert run1_props.root_pool_mode == run0_props.root_pool_mode
+
+
+@pytest.mark.parametrize("opts, msg", [
+    (["--skip-init"], "--reuse-diff-root makes no sense with --skip-init or --hermetic-build"),
+    (["--parallel-diff"], "options --reuse-diff-root and --parallel-diff are mutually exclusive"),
+])
+def test_reuse_diff_root_option_conflicts(csmock_main, monkeypatch, tmp_path, capsys, opts, msg):
+    profile = tmp_path / "fedora-44-x86_64.cfg"
+    profile.write_text("")
+    srpm = tmp_path / "foo-1.0-1.src.rpm"
+    srpm.write_bytes(b"")
+    monkeypatch.setattr(sys, "argv", ["csmock", "-r", str(profile), "--diff-patches", "--reuse-diff-root"]
+                        + opts + [str(srpm)])
+    with pytest.raises(SystemExit) as exc:
+        csmock_main.main()
+    assert exc.value.code == 2
+    assert msg in capsys.readouterr().err
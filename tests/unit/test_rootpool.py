@@ -0,0 +1,155 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import pytest
+
+# local imports
+from csmock.common.rootpool import POOL_MODE_CONSUME
+from csmock.common.rootpool import POOL_MODE_CREATE
+from csmock.common.rootpool import RootPool
+from csmock.common.rootpool import SNAPSHOT_PREFIX
+from csmock.common.rootpool import repomd_checksums
+
+
+class FakeMock:
+    def __init__(self, ec=0):
+        self.ec = ec
+        self.cmds = []
+
+    def exec_mock_cmd(self, cmd, quiet=True):
+        self.cmds.append(cmd)
+        return self.ec
+
+
+def write_repomd(cache_dir, repo, data):
+    repodata = cache_dir / repo / "repodata"
+    repodata.mkdir(parents=True)
+    (repodata / "repomd.xml").write_text(data)
+
+
+@pytest.fixture
+def pkg_cache_dir(tmp_path):
+    cache_dir = tmp_path / "dnf"
+    write_repomd(cache_dir, "fedora", "fedora-1")
+    write_repomd(cache_dir, "updates", "updates-1")
+    return cache_dir
+
+
+def make_pool(results, tmp_path, **kwargs):
+    return RootPool(results, str(tmp_path / "pool"), kwargs.pop("max_size", 8), "fedora-44-x86_64", **kwargs)
+
+
+def test_repomd_checksums(pkg_cache_dir, tmp_path):
+    checksums = repomd_checksums(str(pkg_cache_dir))
+    assert len(checksums) == 2
+    assert checksums == sorted(checksums)
+    assert repomd_checksums(str(tmp_path / "missing")) == []
+
+
+def test_key_for(results, tmp_path, pkg_cache_dir):
+    pool = make_pool(results, tmp_path)
+    key = pool.key_for("fedora-44-x86_64", None, ["gcc", "make"], [], str(pkg_cache_dir))
+    assert key.startswith(SNAPSHOT_PREFIX)
+
+    # the order and duplicates of packages do not matter
+    assert pool.key_for("fedora-44-x86_64", None, ["make", "gcc", "gcc"], [], str(pkg_cache_dir)) == key
+
+    # other packages, profile or repositories give a different key
+    assert pool.key_for("fedora-44-x86_64", None, ["gcc"], [], str(pkg_cache_dir)) != key
+    assert pool.key_for("fedora-43-x86_64", None, ["gcc", "make"], [], str(pkg_cache_dir)) != key
+    assert pool.key_for("fedora-44-x86_64", None, ["gcc", "make"], ["http://repo"], str(pkg_cache_dir)) != key
+
+    # an update of repository metadata invalidates the key
+    (pkg_cache_dir / "updates" / "repodata" / "repomd.xml").write_text("updates-2")
+    assert pool.key_for("fedora-44-x86_64", None, ["gcc", "make"], [], str(pkg_cache_dir)) != key
+
+
+def test_key_for_unknown(results, tmp_path, pkg_cache_dir, monkeypatch):
+    pool = make_pool(results, tmp_path)
+
+    # no repository metadata cached yet
+    assert pool.key_for("fedora-44-x86_64", None, [], [], str(tmp_path / "empty")) is None
+    assert pool.key_for("fedora-44-x86_64", None, [], [], None) is None
+
+    # requires of the SRPM cannot be read
+    monkeypatch.setattr("csmock.common.rootpool.query_srpm", lambda results, srpm: None)
+    assert pool.key_for("fedora-44-x86_64", "foo.src.rpm", [], [], str(pkg_cache_dir)) is None
+
+
+def test_store_and_restore(results, tmp_path):
+    mock = FakeMock()
+    pool = make_pool(results, tmp_path)
+    assert not pool.restore(mock, None)
+    assert not pool.restore(mock, "csmock-pool-a")
+    assert results.ini_writer.entries["root-pool"] == "miss"
+
+    pool.store(mock, "csmock-pool-a")
+    assert mock.cmds[-1] == ["--snapshot", "csmock-pool-a"]
+    assert pool.current == "csmock-pool-a"
+
+    # a new scan finds the snapshot in the index
+    mock = FakeMock()
+    pool = make_pool(results, tmp_path)
+    assert pool.restore(mock, "csmock-pool-a")
+    assert mock.cmds == [["--rollback-to", "csmock-pool-a"]]
+    assert results.ini_writer.entries["root-pool"] == "hit"
+    assert results.ini_writer.entries["root-pool-hits"] == 1
+    assert results.ini_writer.entries["root-pool-misses"] == 1
+
+    # storing the snapshot the buildroot is based on is a no-op
+    pool.store(mock, "csmock-pool-a")
+    assert len(mock.cmds) == 1
+
+
+def test_restore_failure(results, tmp_path):
+    pool = make_pool(results, tmp_path)
+    pool.store(FakeMock(), "csmock-pool-a")
+
+    pool = make_pool(results, tmp_path)
+    assert not pool.restore(FakeMock(ec=1), "csmock-pool-a")
+    assert "csmock-pool-a" not in pool.load_index()["snapshots"]
+    assert results.errors
+
+
+def test_eviction(results, tmp_path):
+    mock = FakeMock()
+    pool = make_pool(results, tmp_path, max_size=2)
+    for key in ["csmock-pool-a", "csmock-pool-b", "csmock-pool-c"]:
+        pool.store(mock, key)
+        pool.current = None
+
+    assert ["--remove-snapshot", "csmock-pool-a"] in mock.cmds
+    assert sorted(pool.load_index()["snapshots"]) == ["csmock-pool-b", "csmock-pool-c"]
+
+
+def test_modes(results, tmp_path):
+    make_pool(results, tmp_path).store(FakeMock(), "csmock-pool-a")
+
+    # the create mode never reuses existing snapshots
+    mock = FakeMock()
+    assert not make_pool(results, tmp_path, mode=POOL_MODE_CREATE).restore(mock, "csmock-pool-a")
+    assert not mock.cmds
+
+    # the consume mode does not store snapshots and drops all of them on exit
+    mock = FakeMock()
+    pool = make_pool(results, tmp_path, mode=POOL_MODE_CONSUME)
+    pool.store(mock, "csmock-pool-b")
+    assert not mock.cmds
+    pool.drop_all(mock)
+    assert mock.cmds == [["--remove-snapshot", "csmock-pool-a"]]
+    assert not pool.load_index()["snapshots"]
@@ -0,0 +1,139 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import sys
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def srpm(tmp_path):
+    srpm = tmp_path / "foo-1.0-1.fc44.src.rpm"
+    srpm.write_bytes(b"")
+    return str(srpm)
+
+
+def scan_hook(results, mock, props):
+    return 0
+
+
+@pytest.mark.parametrize("early", [False, True])
+def test_add_source_scan(csmock_main, early):
+    props = csmock_main.ScanProps()
+    props.scan_sources_early = early
+    props.add_source_scan(scan_hook, reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=["/tmp/out"])
+    props.add_source_scan("scan-sources", reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=["/tmp/out"])
+    assert (props.post_prep_hooks == [scan_hook]) == early
+    assert (props.post_prep_chroot_cmds == ["scan-sources"]) == early
+    assert (props.post_install_hooks == [scan_hook]) != early
+    assert (props.post_build_chroot_cmds == ["scan-sources"]) != early
+    assert props.hook_decls[scan_hook].concurrent
+
+
+def test_scan_of_build_results(csmock_main):
+    props = csmock_main.ScanProps()
+    props.scan_sources_early = True
+    props.add_source_scan("scan-build", reads=[csmock_main.UNPACKED_SOURCES_DIR, "/builddir/build/BUILDROOT"],
+                          writes=[])
+
+    # the analyzer needs results of %build
+    assert props.post_build_chroot_cmds == ["scan-build"]
+    assert not props.post_prep_chroot_cmds
+
+
+def test_scan_sources_early_option(run_main, srpm):
+    (props, _) = run_main(["-t", "unicontrol", "--scan-sources-early", srpm])
+    [cmd] = props.post_prep_chroot_cmds
+    assert not props.post_build_chroot_cmds
+
+    (props, _) = run_main(["-t", "unicontrol", srpm])
+    assert props.post_build_chroot_cmds == [cmd]
+    assert not props.post_prep_chroot_cmds
+
+
+def test_scan_sources_early_with_checkpoint(csmock_main, monkeypatch, tmp_path, srpm, capsys):
+    profile = tmp_path / "fedora-44-x86_64.cfg"
+    profile.write_text("")
+    monkeypatch.setattr(sys, "argv", ["csmock", "-r", str(profile), "--scan-sources-early", "--checkpoint", srpm])
+    with pytest.raises(SystemExit) as exc:
+        csmock_main.main()
+    assert exc.value.code == 2
+    assert "--scan-sources-early and --checkpoint are mutually exclusive" in capsys.readouterr().err
+
+
+@pytest.fixture
+def mock(csmock_main, results):
+    """MockWrapper running chroot commands in the calling thread"""
+    mock = object.__new__(csmock_main.MockWrapper)
+    mock.results = results
+    mock.use_shell = True
+    mock.shell = None
+    mock.post_prep = None
+    mock.cmds = []
+
+    def exec_chroot_cmd(cmd):
+        mock.cmds.append((cmd, mock.use_shell))
+        return 0
+
+    mock.exec_chroot_cmd = exec_chroot_cmd
+    return mock
+
+
+def test_post_prep(csmock_main, mock):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_hook(results, mock, props):
+        started.set()
+        release.wait()
+        return 0
+
+    props = csmock_main.ScanProps()
+    props.scan_sources_early = True
+    props.add_source_scan(slow_hook, reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=["/tmp/a"])
+    props.add_source_scan("scan-sources", reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=["/tmp/b"])
+
+    # the hooks run in the background while the persistent shell is not used
+    mock.start_post_prep(props)
+    assert started.wait(10)
+    assert not mock.use_shell
+    release.set()
+
+    mock.join_post_prep()
+    assert mock.post_prep is None
+    assert mock.use_shell
+    assert mock.cmds == [("scan-sources", False)]
+
+
+def test_post_prep_nothing_to_run(csmock_main, mock):
+    mock.start_post_prep(csmock_main.ScanProps())
+    assert mock.post_prep is None
+    assert mock.use_shell
+    mock.join_post_prep()
+
+
+def test_post_prep_failure(csmock_main, mock, results):
+    props = csmock_main.ScanProps()
+    props.scan_sources_early = True
+    props.add_source_scan(lambda results, mock, props: 1, reads=[csmock_main.UNPACKED_SOURCES_DIR], writes=[])
+    results.keep_going = True
+    mock.start_post_prep(props)
+    mock.join_post_prep()
+    assert len(results.errors) == 1
+    assert "returned 1" in results.errors[0]
@@ -0,0 +1,90 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import pytest
+
+DEBUG_CONFIG = """config_opts['cache_topdir'] = '/srv/mock-cache'
+config_opts['package_manager'] = 'dnf5'
+config_opts['root'] = 'fedora-44-x86_64'
+"""
+
+
+@pytest.fixture
+def mock(csmock_main, results):
+    """MockWrapper of an overridden root with mock queried for its configuration"""
+    mock = object.__new__(csmock_main.MockWrapper)
+    mock.results = results
+    mock.mock_profile = "fedora-44-x86_64"
+    mock.mock_root_override = "fedora-44-x86_64-batch0"
+    mock.bwrap = None
+    mock.debug_config = None
+    mock.profile_cache_dirs = None
+    mock.shared_cache_opts = None
+    mock.queries = []
+
+    def get_cmd_output(cmd, shell=True):
+        mock.queries.append(cmd)
+        return (0, DEBUG_CONFIG)
+
+    results.get_cmd_output = get_cmd_output
+    return mock
+
+
+def test_profile_cache_dirs(mock):
+    assert mock.get_profile_cache_dirs() == ("/srv/mock-cache/fedora-44-x86_64", "dnf5_cache")
+
+    # mock is queried only once
+    assert mock.get_profile_cache_dirs() == ("/srv/mock-cache/fedora-44-x86_64", "dnf5_cache")
+    assert mock.queries == [["mock", "-r", "fedora-44-x86_64", "--debug-config-expanded"]]
+
+
+def test_profile_cache_dirs_defaults(csmock_main, mock):
+    mock.debug_config = "config_opts['root'] = 'fedora-44-x86_64'\n"
+    assert mock.get_profile_cache_dirs() == (f"{csmock_main.MOCK_CACHE_TOPDIR}/fedora-44-x86_64", "dnf_cache")
+
+
+def test_profile_cache_dirs_unknown(mock, results):
+    mock.debug_config = "config_opts['chroot_setup_cmd'] = 'install @buildsys-build'\n"
+    assert mock.get_profile_cache_dirs() is None
+    assert mock.get_shared_cache_opts() is None
+
+    # old versions of mock do not support --debug-config-expanded, and mock might fail altogether
+    mock.debug_config = None
+    results.get_cmd_output = lambda cmd, shell=True: (1, "")
+    assert mock.get_profile_cache_dirs() is None
+
+
+def test_shared_cache_opts(mock):
+    assert mock.get_shared_cache_opts() == [
+        "--enable-plugin=root_cache",
+        "--plugin-option=root_cache:dir=/srv/mock-cache/fedora-44-x86_64/root_cache/",
+        "--enable-plugin=yum_cache",
+        "--plugin-option=yum_cache:dir=/srv/mock-cache/fedora-44-x86_64/dnf5_cache/"]
+
+
+def test_host_pkg_cache_dir(mock):
+    # the caches of the overridden root are not shared with the mock profile
+    assert mock.host_pkg_cache_dir() is None
+
+    mock.shared_cache_opts = mock.get_shared_cache_opts()
+    assert mock.host_pkg_cache_dir() == "/srv/mock-cache/fedora-44-x86_64/dnf5_cache"
+
+    # the root is not overridden
+    mock.mock_root_override = None
+    mock.shared_cache_opts = None
+    assert mock.host_pkg_cache_dir() == "/srv/mock-cache/fedora-44-x86_64/dnf5_cache"
@@ -0,0 +1,140 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+
+# standard imports
+import os
+
+import pytest
+
+# local imports
+import csmock.common.tmpfs
+from csmock.common.results import ScanResults
+from csmock.common.tmpfs import TMPFS_MIN_SIZE
+from csmock.common.tmpfs import TmpfsOverflow
+from csmock.common.tmpfs import TmpfsRoot
+from csmock.common.tmpfs import package_name
+from csmock.common.tmpfs import parse_size_mb
+from csmock.common.tmpfs import record_usage
+
+SRPM = "/tmp/foo-bar-1.0-1.fc44.src.rpm"
+
+
+@pytest.fixture
+def meminfo(monkeypatch):
+    mem = {"MemTotal": 16384, "MemAvailable": 12288}
+    monkeypatch.setattr(csmock.common.tmpfs, "meminfo_mb", lambda field: mem[field])
+    return mem
+
+
+@pytest.fixture
+def new_root(results, tmp_path, meminfo):
+    def new_root(mode="auto", budget_mb=None):
+        return TmpfsRoot(results, mode, budget_mb, res_dir=str(tmp_path / "res"),
+                         usage_file=str(tmp_path / "usage.json"))
+    return new_root
+
+
+def test_package_name():
+    assert package_name(SRPM) == "foo-bar"
+    assert package_name("/tmp/foo.tar.xz") == "foo.tar.xz"
+
+
+@pytest.mark.parametrize("val, size", [("4096", 4096), ("512M", 512), ("8G", 8192), ("8g", 8192)])
+def test_parse_size_mb(val, size):
+    assert parse_size_mb(val) == size
+
+
+@pytest.mark.parametrize("val", ["x", "1T", "", "-1"])
+def test_parse_size_mb_invalid(val):
+    with pytest.raises(ValueError):
+        parse_size_mb(val)
+
+
+def test_plan_shares_budget(new_root):
+    # the default budget is half of the host memory
+    root1 = new_root()
+    root1.plan(SRPM)
+    assert root1.size_mb == 8192
+
+    # nothing is left for a concurrent scan of a package without measured usage
+    root2 = new_root()
+    root2.plan(SRPM)
+    assert root2.size_mb is None
+
+    # the budget is available again once the first scan has finished
+    root1.release()
+    root2.plan(SRPM)
+    assert root2.size_mb == 8192
+
+
+def test_plan_uses_measured_usage(new_root, tmp_path):
+    record_usage("foo-bar", 2000, str(tmp_path / "usage.json"))
+    roots = [new_root(budget_mb=6000) for _ in range(3)]
+    for root in roots:
+        root.plan(SRPM)
+    assert [root.size_mb for root in roots] == [2500, 2500, None]
+
+
+def test_plan_limited_by_available_memory(new_root, meminfo):
+    meminfo["MemAvailable"] = TMPFS_MIN_SIZE - 1
+    root = new_root(mode="auto")
+    root.plan(SRPM)
+    assert root.size_mb is None
+
+    root = new_root(mode="always")
+    root.plan(SRPM)
+    assert root.size_mb == TMPFS_MIN_SIZE - 1
+
+
+def test_stale_reservation_dropped(new_root, tmp_path):
+    root = new_root(budget_mb=4096)
+    root.plan(SRPM)
+    assert root.size_mb == 4096
+
+    # simulate a process that was killed (its reservation file is no longer locked)
+    os.close(root.reservation.fd)
+    root.reservation.fd = None
+
+    root2 = new_root(budget_mb=4096)
+    root2.plan(SRPM)
+    assert root2.size_mb == 4096
+    assert sorted(os.listdir(tmp_path / "res")) == [".lock", os.path.basename(root2.reservation.path)]
+
+
+def test_overflow_recorded(new_root, tmp_path, results):
+    root = new_root(budget_mb=4096)
+    root.plan(SRPM)
+    root.start_monitor(str(tmp_path))
+    root.peak_usage = 4000 << 20
+    assert root.stop_monitor()
+
+    # the next scan of the package needs more than the budget, so it goes to disk
+    root.release()
+    root = new_root(budget_mb=4096)
+    root.plan(SRPM)
+    assert root.size_mb is None
+
+
+@pytest.mark.parametrize("name", ["foo.tar.xz", "foo"])
+def test_overflow_discards_output(tmp_path, name):
+    output = tmp_path / name
+    with pytest.raises(TmpfsOverflow):
+        with ScanResults(str(output), "csmock", "0.0", False) as results:
+            results.discard = True
+            raise TmpfsOverflow()
+    assert not os.path.exists(output)
+    assert not os.path.exists(results.tmpdir)
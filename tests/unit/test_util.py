@@ -0,0 +1,147 @@
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This file is part of csmock.
+#
+# csmock is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# csmock is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with csmock.  If not, see <http://www.gnu.org/licenses/>.
+# standard imports
+import errno
+import os
+import pprint
+
+import pytest
+
+# local imports
+import csmock.common.util
+from csmock.common.util import debug_config_value
+from csmock.common.util import move_tree
+from csmock.common.util import query_srpm
+
+
+DEBUG_CONFIG = """config_opts['chroot_setup_cmd'] = 'install @buildsys-build'
+config_opts['dnf.conf'] = %s
+config_opts['plugin_conf'] = %s
+config_opts['root'] = 'fedora-44-x86_64'
+""" % (pprint.pformat("[main]\n" + "gpgcheck=1\n" * 20), pprint.pformat({"k%d" % i: i for i in range(20)}))
+
+
+def test_debug_config_value():
+    assert debug_config_value(DEBUG_CONFIG, "root") == "fedora-44-x86_64"
+    assert debug_config_value(DEBUG_CONFIG, "dnf.conf") == "[main]\n" + "gpgcheck=1\n" * 20
+    assert debug_config_value(DEBUG_CONFIG, "plugin_conf") == {"k%d" % i: i for i in range(20)}
+
+
+@pytest.mark.parametrize("key", ["missing", "dnf"])
+def test_debug_config_value_missing(key):
+    assert debug_config_value(DEBUG_CONFIG, key) is None
+
+
+def test_debug_config_value_not_literal():
+    assert debug_config_value("config_opts['x'] = object()\n", "x") is None
+
+
+@pytest.fixture
+def src_tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub" / "empty").mkdir(parents=True)
+    (src / "sub" / "file").write_text("data")
+    (src / "link").symlink_to("sub/file")
+    (src / "dirlink").symlink_to("sub")
+    os.chmod(src / "sub", 0o750)
+    return src
+
+
+def check_moved(src, dst):
+    assert not os.path.lexists(src)
+    assert (dst / "sub" / "file").read_text() == "data"
+    assert (dst / "sub" / "empty").is_dir()
+    assert os.readlink(dst / "link") == "sub/file"
+    assert os.readlink(dst / "dirlink") == "sub"
+    assert os.stat(dst / "sub").st_mode & 0o777 == 0o750
+
+
+def test_move_tree(src_tree, tmp_path):
+    move_tree(str(src_tree), str(tmp_path / "dst"))
+    check_moved(src_tree, tmp_path / "dst")
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    def rename(src, dst):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+    monkeypatch.setattr(os, "rename", rename)
+
+
+def test_move_tree_cross_device(src_tree, tmp_path, cross_device):
+    move_tree(str(src_tree), str(tmp_path / "dst"))
+    check_moved(src_tree, tmp_path / "dst")
+
+
+def test_move_file_cross_device(src_tree, tmp_path, cross_device):
+    src = src_tree / "sub" / "file"
+    os.chmod(src, 0o640)
+    move_tree(str(src), str(tmp_path / "file"))
+    assert not os.path.exists(src)
+    assert (tmp_path / "file").read_text() == "data"
+    assert os.stat(tmp_path / "file").st_mode & 0o777 == 0o640
+
+
+def test_move_tree_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        move_tree(str(tmp_path / "missing"), str(tmp_path / "dst"))
+    assert not os.path.lexists(tmp_path / "dst")
+
+
+def test_move_tree_not_permitted(src_tree, tmp_path, monkeypatch):
+    rename = os.rename
+
+    def rename_not_permitted(src, dst):
+        if src.endswith("/file"):
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), src)
+        rename(src, dst)
+
+    # the entries moved before the failure are moved back
+    monkeypatch.setattr(os, "rename", rename_not_permitted)
+    with pytest.raises(PermissionError):
+        move_tree(str(src_tree), str(tmp_path / "dst"))
+    assert not os.path.lexists(tmp_path / "dst")
+    assert sorted(os.listdir(src_tree)) == ["dirlink", "link", "sub"]
+    assert (src_tree / "sub" / "file").read_text() == "data"
+
+
+class RpmResults:
+    def __init__(self, ec, out):
+        self.ec = ec
+        self.out = out
+        self.cmds = []
+
+    def get_cmd_output(self, cmd, shell=True):
+        self.cmds.append(cmd)
+        return (self.ec, self.out)
+
+
+@pytest.fixture
+def no_rpm_module(monkeypatch):
+    monkeypatch.setattr(csmock.common.util, "rpm", None)
+
+
+def test_query_srpm(no_rpm_module):
+    out = "F:foo.spec\nF:foo-1.0.tar.gz\nR:make\nR:gcc  >=  10\nR:make\nR:bar\n"
+    results = RpmResults(0, out)
+    assert query_srpm(results, "foo.src.rpm") == (["foo.spec", "foo-1.0.tar.gz"], ["bar", "gcc >= 10", "make"])
+    assert results.cmds[0][:2] == ["rpm", "-qp"]
+    assert results.cmds[0][-1] == "foo.src.rpm"
+
+
+def test_query_srpm_failure(no_rpm_module):
+    assert query_srpm(RpmResults(1, ""), "foo.src.rpm") is None